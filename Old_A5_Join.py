@@ -1,19 +1,10 @@
-import os
-import json
-import gspread
 import pandas as pd
-from gspread_dataframe import get_as_dataframe, set_with_dataframe
-from oauth2client.service_account import ServiceAccountCredentials
+import conversao
+import google_clients
+import publicacao
 
-# 🔐 Lê o segredo e salva como credentials.json
-gdrive_credentials = os.getenv("GDRIVE_SERVICE_ACCOUNT")
-with open("credentials.json", "w") as f:
-    json.dump(json.loads(gdrive_credentials), f)
-
-# 📌 Autenticação com Google
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(creds)
+# 📌 Autenticação com Google (clientes compartilhados do processo)
+google_clients.aquecer()
 
 # === IDs das planilhas ===
 planilhas_ids = {
@@ -24,10 +15,7 @@ planilhas_ids = {
 
 # === Função para abrir e ler planilha por ID ===
 def ler_planilha_por_id(nome_arquivo):
-    planilha = client.open_by_key(planilhas_ids[nome_arquivo])
-    aba = planilha.sheet1
-    df = get_as_dataframe(aba).dropna(how="all")
-    return df
+    return publicacao.ler_dataframe(planilhas_ids[nome_arquivo])
 
 # Lê os dados das planilhas principais
 print("📥 Lendo planilhas de contas a receber e contas a pagar...")
@@ -48,13 +36,8 @@ campos_data = ['lastAcquittanceDate', 'financialEvent.competenceDate', 'dueDate'
 print("📅 Convertendo campos de data para formato YYYY-MM-DD...")
 for campo in campos_data:
     if campo in df_completo.columns:
-        # Converte para datetime usando format='mixed' para lidar com múltiplos formatos
-        df_completo[campo] = pd.to_datetime(
-            df_completo[campo], 
-            format='mixed',
-            dayfirst=True,
-            errors='coerce'
-        )
+        # Converte para datetime detectando o formato (dd/mm/AAAA, AAAA-MM-DD, ...)
+        df_completo[campo] = conversao.datas(df_completo[campo])
         # Converte para string no formato YYYY-MM-DD
         df_completo[campo] = df_completo[campo].dt.strftime('%Y-%m-%d')
         # Substitui valores NaT (datas inválidas) por string vazia
@@ -80,12 +63,12 @@ if 'categoriesRatio.costCentersRatio.0.costCenter' in df_completo.columns:
 
 # 📄 Abrir a planilha de saída
 print("\n📤 Atualizando planilha consolidada...")
-planilha_saida = client.open_by_key(planilhas_ids["Financeiro_Completo_King"])
-aba_saida = planilha_saida.sheet1
+id_saida = planilhas_ids["Financeiro_Completo_King"]
 
-# Limpa a aba e sobrescreve
-aba_saida.clear()
-set_with_dataframe(aba_saida, df_completo)
+# Reescreve a aba numa aba de preparo e troca pela antiga de uma vez
+publicacao.publicar_completo(
+    id_saida, publicacao.titulo_aba(id_saida), publicacao.grade_texto(df_completo), "USER_ENTERED"
+)
 
 print("✅ Planilha consolidada atualizada com sucesso!")
 print(f"📋 Total de colunas exportadas: {len(df_completo.columns)}")
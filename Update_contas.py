@@ -1,25 +1,84 @@
-import os
+import sys
 import time
-import glob
-import subprocess
+import importlib
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import instrumentacao
 
-# Caminho onde estão os scripts
-caminho_scripts = "./"  # ajuste aqui se estiverem em outro diretório
+# Etapas do pipeline: módulo, função de entrada, argumentos e dependências
+# A1 e A2 rodam em paralelo → A6 pivota. Não há etapa de limpeza: as abas são atualizadas
+# por diff de linhas e, quando precisam ser reescritas, a troca é atômica (publicacao.publicar_completo).
+ETAPAS = {
+    "A1_Contas_a_pagar": {"modulo": "extrator_contas", "funcao": "executar", "args": (["pagar"],), "depende_de": []},
+    "A2_Contas_a_receber": {"modulo": "extrator_contas", "funcao": "executar", "args": (["receber"],), "depende_de": []},
+    "A6_Pivot": {"modulo": "A6_Pivot", "funcao": "main", "args": (), "depende_de": ["A1_Contas_a_pagar", "A2_Contas_a_receber"]},
+}
 
-# Lista todos os arquivos com o padrão especificado
-arquivos = glob.glob(os.path.join(caminho_scripts, "A*.py"))
 
-# Ordena os arquivos em ordem alfabética (funciona para nomes padronizados como os seus)
-arquivos.sort()
-
-# Executa os scripts um por um
-for arquivo in arquivos:
-    print(f"\nExecutando: {arquivo}")
+def rodar_etapa(nome, etapa):
+    """Executa uma etapa no próprio processo e devolve True se terminou sem erro"""
+    print(f"\nExecutando: {nome}")
+    inicio = time.perf_counter()
     try:
-        resultado = subprocess.run(["python", arquivo], check=True)
-        print(f"✔️ Finalizado com sucesso: {arquivo}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Erro ao executar {arquivo}: {e}")
-    time.sleep(10)
+        with instrumentacao.etapa(nome):
+            modulo = importlib.import_module(etapa["modulo"])
+            getattr(modulo, etapa["funcao"])(*etapa["args"])
+    except BaseException as e:
+        if isinstance(e, KeyboardInterrupt):
+            raise
+        traceback.print_exc()
+        print(f"❌ Erro ao executar {nome}: {e}")
+        return False
+    print(f"✔️ Finalizado com sucesso: {nome} ({time.perf_counter() - inicio:.1f}s)")
+    return True
+
+
+def executar_dag(etapas, max_workers=None):
+    """Roda as etapas respeitando as dependências; as independentes rodam em paralelo"""
+    status = {}
+    pendentes = dict(etapas)
+    em_execucao = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(etapas)) as executor:
+        while pendentes or em_execucao:
+            # Agenda as etapas prontas e pula as que dependem de uma etapa que falhou
+            mudou = True
+            while mudou:
+                mudou = False
+                for nome, etapa in list(pendentes.items()):
+                    deps = etapa["depende_de"]
+                    if any(status.get(d) in ("falhou", "pulada") for d in deps):
+                        status[nome] = "pulada"
+                        print(f"⏭️ Pulando {nome}: dependência não concluída")
+                    elif all(status.get(d) == "ok" for d in deps):
+                        em_execucao[executor.submit(rodar_etapa, nome, etapa)] = nome
+                    else:
+                        continue
+                    del pendentes[nome]
+                    mudou = True
+
+            if not em_execucao:
+                break
+
+            concluidas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for future in concluidas:
+                nome = em_execucao.pop(future)
+                status[nome] = "ok" if future.result() else "falhou"
+
+    return status
+
+
+def main():
+    inicio = time.perf_counter()
+    status = executar_dag(ETAPAS)
+
+    print(f"\nTodos os scripts foram processados em {time.perf_counter() - inicio:.1f}s.")
+    for nome in ETAPAS:
+        print(f"  - {nome}: {status.get(nome)}")
+
+    if any(s != "ok" for s in status.values()):
+        sys.exit(1)
+
 
-print("\nTodos os scripts foram processados.")
+if __name__ == "__main__":
+    main()
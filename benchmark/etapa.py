@@ -0,0 +1,34 @@
+import os
+import sys
+import json
+import time
+
+# Roda a partir da raiz do repositório, com os módulos do pipeline importáveis
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import Update_contas  # noqa: E402
+from instrumentacao import pico_rss_mb  # noqa: E402
+
+# ===================== Etapas medidas =====================
+# As do Update_contas (A1, A2 → A6) e a análise da IA, que roda em outro workflow
+ETAPAS = {
+    **Update_contas.ETAPAS,
+    "IA": {"modulo": "IA", "funcao": "main", "args": (), "depende_de": ["A6_Pivot"]},
+}
+ORDEM = list(ETAPAS)
+
+
+def main():
+    nome, saida = sys.argv[1], sys.argv[2]
+    os.chdir(RAIZ)
+    inicio = time.perf_counter()
+    ok = Update_contas.rodar_etapa(nome, ETAPAS[nome])
+    resultado = {"ok": ok, "tempo_s": round(time.perf_counter() - inicio, 3), "pico_rss_mb": round(pico_rss_mb(), 1)}
+    with open(saida, "w") as arquivo:
+        json.dump(resultado, arquivo)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Benchmark ponta a ponta do pipeline (A1 → A2 → A6 → IA) contra servidores locais
+
+Sobe stand-ins da Conta Azul, do Sheets/Drive e da DeepSeek, roda cada etapa num
+processo próprio apontado para eles (estado e snapshots num diretório temporário) e
+mede tempo, pico de RSS e requisições por servidor. Exemplos:
+
+    python benchmark/executar.py --linhas 20000
+    python benchmark/executar.py --linhas 200000 --rodadas 2 --saida atual.json --base base.json
+"""
+import os
+import sys
+import json
+import glob
+import shutil
+import argparse
+import tempfile
+import subprocess
+import gerador
+from etapa import ORDEM, RAIZ
+from stub_conta_azul import iniciar_conta_azul
+from stub_google import iniciar_google
+from stub_deepseek import iniciar_deepseek
+
+# ===================== Configurações =====================
+TOLERANCIA = 0.25
+METRICAS_COMPARADAS = ("tempo_s", "pico_rss_mb", "requisicoes")
+# Cotas do limitador do Google (cota_google.py), elevadas por padrão no benchmark
+COTAS_GOOGLE = (
+    "SHEETS_LEITURAS_POR_MINUTO", "SHEETS_ESCRITAS_POR_MINUTO",
+    "SHEETS_LEITURAS_PROJETO_POR_MINUTO", "SHEETS_ESCRITAS_PROJETO_POR_MINUTO",
+    "DRIVE_POR_MINUTO", "DRIVE_PROJETO_POR_MINUTO",
+)
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline contra servidores locais")
+    gerador.adicionar_argumentos(parser)
+    parser.add_argument("--formato", choices=["xlsx", "csv"], default="xlsx", help="formato do export")
+    parser.add_argument("--rodadas", type=int, default=1, help="execuções seguidas (a partir da 2ª: incremental)")
+    parser.add_argument("--latencia-ms", type=float, default=0, help="latência artificial por resposta")
+    parser.add_argument("--etapas", nargs="+", choices=ORDEM, default=ORDEM)
+    parser.add_argument("--saida", help="grava o relatório em JSON")
+    parser.add_argument("--base", help="relatório anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="aumento aceito sobre a base")
+    parser.add_argument("--manter", action="store_true", help="não apaga o diretório temporário")
+    parser.add_argument("--db-url", help="banco da carga (padrão: SQLite no diretório temporário)")
+    parser.add_argument("--cotas-reais", action="store_true", help="mantém as cotas do Google (60/min por usuário)")
+    return parser.parse_args()
+
+
+def diferenca(antes, depois):
+    """Requisições feitas entre duas leituras do contador de um servidor, por rota"""
+    rotas = {}
+    for rota, atual in depois.items():
+        n = atual["requisicoes"] - antes.get(rota, {}).get("requisicoes", 0)
+        if n:
+            rotas[rota] = n
+    return rotas
+
+
+def rodar(nome, rodada, servidores, env, diretorio):
+    """Executa uma etapa num subprocesso e junta as medidas dele com os contadores dos servidores"""
+    antes = {host: s.contador.copia() for host, s in servidores.items()}
+    medidas = os.path.join(diretorio, f"{rodada}_{nome}.json")
+    log = os.path.join(diretorio, "logs", f"{rodada}_{nome}.log")
+    relatorios = os.path.join(diretorio, "relatorios", f"{rodada}_{nome}")
+    with open(log, "w") as saida:
+        processo = subprocess.run(
+            [sys.executable, os.path.join(RAIZ, "benchmark", "etapa.py"), nome, medidas],
+            cwd=RAIZ, env={**env, "INSTRUMENTACAO_DIR": relatorios}, stdout=saida, stderr=subprocess.STDOUT,
+        )
+
+    resultado = {"etapa": nome, "rodada": rodada, "ok": False, "tempo_s": None, "pico_rss_mb": None}
+    if os.path.exists(medidas):
+        with open(medidas) as arquivo:
+            resultado.update(json.load(arquivo))
+    resultado["ok"] = resultado["ok"] and processo.returncode == 0
+    por_host = {host: diferenca(antes[host], s.contador.copia()) for host, s in servidores.items()}
+    resultado["requisicoes_por_host"] = {host: rotas for host, rotas in por_host.items() if rotas}
+    resultado["requisicoes"] = sum(sum(rotas.values()) for rotas in por_host.values())
+    resultado["log"] = log
+
+    # Quebra por subetapa, do relatório gravado pela instrumentacao.py dentro do processo
+    for caminho in glob.glob(os.path.join(relatorios, "*.json")):
+        with open(caminho) as arquivo:
+            relatorio = json.load(arquivo)
+        resultado["subetapas"] = [
+            {k: e.get(k) for k in ("nome", "duracao_s", "cpu_s", "pico_rss_mb", "erro") if e.get(k) is not None}
+            for e in relatorio["etapas"]
+        ]
+    return resultado
+
+
+def imprimir(resultados):
+    print(f"\n{'rodada':>6} {'etapa':<22} {'ok':<3} {'tempo (s)':>10} {'pico RSS (MB)':>14} {'requisições':>12}")
+    for r in resultados:
+        tempo = f"{r['tempo_s']:.2f}" if r["tempo_s"] is not None else "-"
+        rss = f"{r['pico_rss_mb']:.1f}" if r["pico_rss_mb"] is not None else "-"
+        print(f"{r['rodada']:>6} {r['etapa']:<22} {'✔️' if r['ok'] else '❌':<3} {tempo:>10} {rss:>14} {r['requisicoes']:>12}")
+        for host, rotas in r["requisicoes_por_host"].items():
+            detalhe = ", ".join(f"{rota}={n}" for rota, n in sorted(rotas.items()))
+            print(f"{'':>6}   {host}: {detalhe}")
+
+
+def regressoes(resultados, base, tolerancia):
+    """Métricas que pioraram além da tolerância em relação ao relatório base"""
+    anteriores = {(r["rodada"], r["etapa"]): r for r in base["resultados"]}
+    encontradas = []
+    for r in resultados:
+        anterior = anteriores.get((r["rodada"], r["etapa"]))
+        if anterior is None:
+            continue
+        for metrica in METRICAS_COMPARADAS:
+            atual, antes = r.get(metrica), anterior.get(metrica)
+            if atual is not None and antes and atual > antes * (1 + tolerancia):
+                encontradas.append(f"{r['etapa']} (rodada {r['rodada']}): {metrica} {antes} → {atual}")
+    return encontradas
+
+
+def main():
+    args = argumentos()
+    diretorio = tempfile.mkdtemp(prefix="benchmark_")
+    os.makedirs(os.path.join(diretorio, "logs"))
+    latencia = args.latencia_ms / 1000
+
+    print(f"🧪 Gerando exports sintéticos ({args.linhas} linhas por tipo, {args.centros} centros, {args.formato})...")
+    conta_azul = iniciar_conta_azul(gerador.perfil_dos_argumentos(args), latencia)
+    conta_azul.dados.aquecer(gerador.TIPOS, args.formato)
+    servidores = {"conta_azul": conta_azul, "google": iniciar_google(latencia), "deepseek": iniciar_deepseek(latencia)}
+
+    env = {
+        **os.environ,
+        "CONTA_AZUL_URL": conta_azul.url,
+        "CONTA_AZUL_FORMATO": args.formato,
+        "GOOGLE_API_EMULADOR": servidores["google"].url,
+        "DEEPSEEK_URL": servidores["deepseek"].url,
+        "DEEPSEEK_API_KEY": "benchmark",
+        "ESTADO_DIR": os.path.join(diretorio, "estado"),
+        "SNAPSHOT_DIR": os.path.join(diretorio, "snapshots"),
+        "DB_URL": args.db_url or f"sqlite:///{os.path.join(diretorio, 'banco.sqlite')}",
+        "PYTHONUNBUFFERED": "1",
+    }
+    if not args.cotas_reais:
+        # O servidor local não tem cota: mede o pipeline, não a espera imposta pelo limitador
+        env.update({nome: "1000000" for nome in COTAS_GOOGLE})
+
+    resultados = []
+    try:
+        for rodada in range(1, args.rodadas + 1):
+            for nome in [n for n in ORDEM if n in args.etapas]:
+                print(f"▶️ Rodada {rodada}: {nome}...")
+                resultado = rodar(nome, rodada, servidores, env, diretorio)
+                resultados.append(resultado)
+                if not resultado["ok"]:
+                    print(f"❌ {nome} falhou; veja o log em {resultado['log']}")
+                    with open(resultado["log"]) as arquivo:
+                        print("".join(arquivo.readlines()[-20:]))
+    finally:
+        for servidor in servidores.values():
+            servidor.shutdown()
+
+    imprimir(resultados)
+    relatorio = {
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "base", "manter")},
+        "perfil": conta_azul.perfil,
+        "resultados": resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"\n💾 Relatório salvo em {args.saida}")
+
+    if args.manter:
+        print(f"📁 Arquivos da execução em {diretorio}")
+    else:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    falhas = [r for r in resultados if not r["ok"]]
+    piores = []
+    if args.base:
+        with open(args.base) as arquivo:
+            piores = regressoes(resultados, json.load(arquivo), args.tolerancia)
+        for linha in piores:
+            print(f"📉 Regressão: {linha}")
+        if not piores:
+            print(f"✅ Nenhuma regressão acima de {args.tolerancia:.0%} em relação a {args.base}")
+
+    if falhas or piores:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
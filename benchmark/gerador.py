@@ -0,0 +1,266 @@
+"""Gerador de dados sintéticos no formato da Conta Azul
+
+Produz exports financial-statement-view (XLSX ou CSV, um arquivo por tipo e status) e
+resumos de financial-events (JSON Lines) com volume, mix de status, período e
+cardinalidades controláveis. Os mesmos parâmetros e semente geram sempre os mesmos
+dados. Exemplos:
+
+    python benchmark/gerador.py --linhas 100000 --formato csv --saida /tmp/exports
+    python benchmark/gerador.py --linhas 5000000 --formato csv --centros 6 --mix ACQUITTED=0.7,PENDING=0.3
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# ===================== Dados sintéticos no formato da Conta Azul =====================
+# Fração dos registros de cada status
+MIX_STATUS = {
+    "ACQUITTED": 0.45,
+    "PARTIAL": 0.05,
+    "PENDING": 0.20,
+    "LOST": 0.03,
+    "RENEGOTIATED": 0.04,
+    "CONCILIATED": 0.15,
+    "OVERDUE": 0.08,
+}
+SITUACAO = {
+    "ACQUITTED": "Quitado",
+    "PARTIAL": "Parcial",
+    "PENDING": "Em aberto",
+    "LOST": "Perdido",
+    "RENEGOTIATED": "Renegociado",
+    "CONCILIATED": "Conciliado",
+    "OVERDUE": "Atrasado",
+}
+LIQUIDADOS = {"ACQUITTED", "CONCILIATED"}
+TIPOS = ["EXPENSE", "REVENUE"]
+
+# Limite de linhas de uma planilha XLSX (incluindo o cabeçalho)
+MAX_LINHAS_XLSX = 1_048_576
+
+PERFIL_PADRAO = {
+    "linhas": 5000,        # linhas do export por tipo, somando todos os status
+    "mix": MIX_STATUS,
+    "inicio": None,        # vencimentos a partir de (padrão: hoje - 730 dias)
+    "fim": None,           # vencimentos até (padrão: hoje + 90 dias)
+    "n_categorias": 40,    # categorias distintas por tipo
+    "n_centros": 15,       # centros de custo distintos
+    "n_pessoas": 500,      # fornecedores/clientes distintos
+    "centros": 3,          # pares 'Centro de Custo N'/'Valor no Centro de Custo N' no export
+    "centros_min": 0,      # mínimo de centros preenchidos por linha (o máximo é `centros`)
+    "semente": 0,
+}
+
+
+def perfil(**ajustes):
+    """Perfil de geração: PERFIL_PADRAO com os ajustes pedidos e o mix normalizado"""
+    atual = {**PERFIL_PADRAO, **{k: v for k, v in ajustes.items() if v is not None}}
+    mix = {status: float(atual["mix"].get(status, 0)) for status in MIX_STATUS}
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("O mix de status precisa ter ao menos uma fração positiva")
+    atual["mix"] = {status: fracao / total for status, fracao in mix.items()}
+    atual["centros_min"] = min(atual["centros_min"], atual["centros"])
+    return atual
+
+
+def _rng(*partes):
+    """Gerador determinístico: as mesmas partes geram sempre os mesmos dados"""
+    semente = hashlib.sha256("|".join(map(str, partes)).encode()).digest()[:8]
+    return np.random.default_rng(int.from_bytes(semente, "little"))
+
+
+def linhas_por_status(total, mix=MIX_STATUS):
+    """Divide o total de linhas de um tipo entre os status conforme o mix"""
+    return {status: int(round(total * fracao)) for status, fracao in mix.items()}
+
+
+def _ids(rng, n):
+    """Ids no formato UUID"""
+    bruto = rng.integers(0, 2 ** 63, size=(n, 2), dtype=np.int64)
+    hexa = [f"{a:016x}{b:016x}" for a, b in bruto.tolist()]
+    return [f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}" for h in hexa]
+
+
+def _nomes(prefixo, n):
+    """Tabela de nomes para indexar por código (evita formatar um texto por linha)"""
+    return np.array([f"{prefixo} {i:0{max(2, len(str(n)))}d}" for i in range(1, n + 1)], dtype=object)
+
+
+def _periodo(perfil_atual, status, hoje):
+    """Faixa de vencimentos coerente com o status: atrasados no passado, pendentes a partir de hoje"""
+    inicio = pd.Timestamp(perfil_atual["inicio"]) if perfil_atual["inicio"] else hoje - pd.Timedelta(days=730)
+    fim = pd.Timestamp(perfil_atual["fim"]) if perfil_atual["fim"] else hoje + pd.Timedelta(days=90)
+    if status == "OVERDUE" and inicio < hoje:
+        fim = min(fim, hoje - pd.Timedelta(days=1))
+    elif status == "PENDING" and fim >= hoje:
+        inicio = max(inicio, hoje)
+    return inicio, fim
+
+
+def gerar_export(tipo, status, perfil_atual=None, date_from=None, hoje=None):
+    """DataFrame com as colunas do export financial-statement-view para um tipo e um status
+
+    date_from filtra pela 'Data movimento', como o endpoint faz com dateFrom.
+    """
+    perfil_atual = perfil_atual or perfil()
+    n = linhas_por_status(perfil_atual["linhas"], perfil_atual["mix"])[status]
+    rng = _rng(perfil_atual["semente"], tipo, status)
+    hoje = pd.Timestamp(hoje or datetime.today()).normalize()
+
+    inicio, fim = _periodo(perfil_atual, status, hoje)
+    dias = max(1, (fim - inicio).days + 1)
+    vencimento = inicio + pd.to_timedelta(rng.integers(0, dias, n), unit="D")
+    competencia = vencimento - pd.to_timedelta(rng.integers(0, 30, n), unit="D")
+    if status in LIQUIDADOS:
+        movimento = vencimento + pd.to_timedelta(rng.integers(-5, 10, n), unit="D")
+        movimento = movimento.where(movimento <= hoje, hoje)
+    else:
+        movimento = pd.DatetimeIndex([pd.NaT] * n)
+    valor = np.round(rng.lognormal(6, 1.2, n), 2)
+
+    prefixo = "Despesa" if tipo == "EXPENSE" else "Receita"
+    pessoas = _nomes("Fornecedor" if tipo == "EXPENSE" else "Cliente", perfil_atual["n_pessoas"])
+    dados = {
+        "id": _ids(rng, n),
+        "Data movimento": movimento,
+        "Data original de vencimento": vencimento,
+        "Data de competência": competencia,
+        "Descrição": [f"{prefixo} {i}" for i in rng.integers(1, 10 ** 6, n).tolist()],
+        "Nome do fornecedor/cliente": pessoas[rng.integers(0, len(pessoas), n)],
+        "Categoria 1": _nomes(prefixo, perfil_atual["n_categorias"])[rng.integers(0, perfil_atual["n_categorias"], n)],
+        "Valor (R$)": valor,
+        "Situação": SITUACAO[status],
+    }
+
+    # Cada linha usa de centros_min a `centros` centros de custo, com o valor dividido entre eles
+    centros = _nomes("Centro", perfil_atual["n_centros"])
+    usados = rng.integers(perfil_atual["centros_min"], perfil_atual["centros"] + 1, n)
+    parcela = np.round(valor / np.maximum(usados, 1), 2)
+    for j in range(1, perfil_atual["centros"] + 1):
+        ativo = usados >= j
+        dados[f"Centro de Custo {j}"] = np.where(ativo, centros[rng.integers(0, len(centros), n)], None)
+        dados[f"Valor no Centro de Custo {j}"] = np.where(ativo, parcela, np.nan)
+
+    df = pd.DataFrame(dados)
+    if date_from:
+        df = df[df["Data movimento"] >= pd.Timestamp(date_from)].reset_index(drop=True)
+    return df
+
+
+def gerar_detalhe(fid, perfil_atual=None):
+    """Resumo de um financial-event (mesmo formato do endpoint summary)"""
+    perfil_atual = perfil_atual or perfil()
+    rng = _rng(perfil_atual["semente"], "detalhe", fid)
+    categorias = []
+    for _ in range(int(rng.integers(1, 4))):
+        valor = round(float(rng.lognormal(6, 1.2)), 2)
+        quantidade = int(rng.integers(perfil_atual["centros_min"], perfil_atual["centros"] + 1))
+        centros = [
+            {"costCenter": f"Centro {int(c):02d}", "value": round(valor / max(quantidade, 1), 2)}
+            for c in rng.integers(1, perfil_atual["n_centros"] + 1, quantidade)
+        ]
+        categorias.append({
+            "category": f"Categoria {int(rng.integers(1, perfil_atual['n_categorias'] + 1)):02d}",
+            "value": valor,
+            "costCentersRatio": centros,
+        })
+    return {
+        "id": fid,
+        "observation": "desconsiderar anexo" if rng.random() < 0.05 else "",
+        "attachments": [{"name": "nota.pdf"}] if rng.random() < 0.6 else [],
+        "categoriesRatio": categorias,
+    }
+
+
+# ===================== Arquivos =====================
+def salvar_export(df, caminho, formato):
+    """Grava o export como a Conta Azul entrega: XLSX ou CSV brasileiro (';' e vírgula decimal)"""
+    if formato == "csv":
+        df.to_csv(caminho, sep=";", decimal=",", date_format="%d/%m/%Y", index=False, encoding="utf-8-sig")
+        return len(df)
+    if len(df) >= MAX_LINHAS_XLSX:
+        rotulo = os.path.basename(caminho) if isinstance(caminho, str) else "export"
+        print(f"  ⚠️ {rotulo}: {len(df)} linhas não cabem em XLSX; "
+              f"gravando só as primeiras {MAX_LINHAS_XLSX - 1} (use --formato csv)")
+        df = df.iloc[:MAX_LINHAS_XLSX - 1]
+    df.to_excel(caminho, index=False, engine="openpyxl")
+    return len(df)
+
+
+def salvar_detalhes(ids, caminho, perfil_atual):
+    """Grava os resumos dos ids em JSON Lines (um financial-event por linha)"""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for fid in ids:
+            arquivo.write(json.dumps(gerar_detalhe(fid, perfil_atual), ensure_ascii=False) + "\n")
+
+
+def _mix(texto):
+    """'ACQUITTED=0.6,PENDING=0.4' → dicionário de frações"""
+    mix = {}
+    for parte in filter(None, texto.split(",")):
+        status, _, fracao = parte.partition("=")
+        status = status.strip().upper()
+        if status not in MIX_STATUS:
+            raise argparse.ArgumentTypeError(f"Status desconhecido: {status}")
+        mix[status] = float(fracao)
+    return mix
+
+
+def adicionar_argumentos(parser):
+    """Opções do perfil de geração (compartilhadas com o benchmark)"""
+    parser.add_argument("--linhas", type=int, default=PERFIL_PADRAO["linhas"], help="linhas do export por tipo")
+    parser.add_argument("--mix", type=_mix, help="frações por status, ex.: ACQUITTED=0.6,PENDING=0.4")
+    parser.add_argument("--inicio", help="primeiro vencimento (AAAA-MM-DD)")
+    parser.add_argument("--fim", help="último vencimento (AAAA-MM-DD)")
+    parser.add_argument("--categorias", dest="n_categorias", type=int, default=PERFIL_PADRAO["n_categorias"])
+    parser.add_argument("--centros-distintos", dest="n_centros", type=int, default=PERFIL_PADRAO["n_centros"])
+    parser.add_argument("--pessoas", dest="n_pessoas", type=int, default=PERFIL_PADRAO["n_pessoas"])
+    parser.add_argument("--centros", type=int, default=PERFIL_PADRAO["centros"], help="pares 'Centro de Custo N' no export")
+    parser.add_argument("--centros-min", type=int, default=PERFIL_PADRAO["centros_min"], help="centros preenchidos no mínimo por linha")
+    parser.add_argument("--semente", type=int, default=PERFIL_PADRAO["semente"])
+
+
+def perfil_dos_argumentos(args):
+    return perfil(**{chave: getattr(args, chave, None) for chave in PERFIL_PADRAO})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera exports e resumos sintéticos da Conta Azul")
+    adicionar_argumentos(parser)
+    parser.add_argument("--formato", choices=["xlsx", "csv"], default="csv")
+    parser.add_argument("--tipos", nargs="+", choices=TIPOS, default=TIPOS)
+    parser.add_argument("--detalhes", type=int, default=1000, help="resumos gerados por tipo (0 = nenhum, -1 = todos)")
+    parser.add_argument("--saida", default="dados_sinteticos")
+    args = parser.parse_args()
+
+    perfil_atual = perfil_dos_argumentos(args)
+    os.makedirs(args.saida, exist_ok=True)
+    for tipo in args.tipos:
+        ids = []
+        for status in MIX_STATUS:
+            inicio = time.perf_counter()
+            df = gerar_export(tipo, status, perfil_atual)
+            caminho = os.path.join(args.saida, f"{tipo}_{status}.{args.formato}")
+            gravadas = salvar_export(df, caminho, args.formato)
+            ids.extend(df["id"].iloc[:gravadas].tolist() if args.detalhes else [])
+            print(f"  ✅ {caminho}: {gravadas} linhas em {time.perf_counter() - inicio:.1f}s")
+
+        if args.detalhes:
+            ids = ids if args.detalhes < 0 else ids[:args.detalhes]
+            caminho = os.path.join(args.saida, f"{tipo}_detalhes.jsonl")
+            salvar_detalhes(ids, caminho, perfil_atual)
+            print(f"  ✅ {caminho}: {len(ids)} resumos")
+
+    with open(os.path.join(args.saida, "perfil.json"), "w", encoding="utf-8") as arquivo:
+        json.dump(perfil_atual, arquivo, ensure_ascii=False, indent=2)
+    print(f"🧪 Dados sintéticos gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ===================== Base dos servidores locais do benchmark =====================
+
+
+class Contador:
+    """Requisições e bytes respondidos por rota, seguro entre threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rotas = {}
+
+    def registrar(self, rota, bytes_saida):
+        with self.lock:
+            atual = self.rotas.setdefault(rota, {"requisicoes": 0, "bytes": 0})
+            atual["requisicoes"] += 1
+            atual["bytes"] += bytes_saida
+
+    def copia(self):
+        with self.lock:
+            return {rota: dict(v) for rota, v in self.rotas.items()}
+
+
+class Manipulador(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1 com keep-alive; as subclasses implementam rotear(metodo)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def corpo(self):
+        return self._corpo
+
+    def corpo_json(self):
+        dados = self.corpo()
+        return json.loads(dados) if dados else {}
+
+    def responder(self, rota, status, corpo, tipo="application/json", cabecalhos=None):
+        if self.server.latencia:
+            time.sleep(self.server.latencia)
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+        self.server.contador.registrar(rota, len(corpo))
+
+    def responder_json(self, rota, dados, status=200):
+        self.responder(rota, status, json.dumps(dados, ensure_ascii=False).encode("utf-8"))
+
+    def nao_encontrado(self):
+        self.responder_json("nao_encontrado", {"error": {"code": 404, "message": self.path}}, 404)
+
+    def _atender(self, metodo):
+        # O corpo é sempre consumido, senão sobra na conexão keep-alive e corrompe o próximo pedido
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        self._corpo = self.rfile.read(tamanho) if tamanho else b""
+        self.rotear(metodo)
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+    def do_PUT(self):
+        self._atender("PUT")
+
+    def rotear(self, metodo):
+        raise NotImplementedError
+
+
+class Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, manipulador, latencia=0.0, **estado):
+        super().__init__(("127.0.0.1", 0), manipulador)
+        self.contador = Contador()
+        self.latencia = latencia
+        self.__dict__.update(estado)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def iniciar(manipulador, latencia=0.0, **estado):
+    """Sobe o servidor numa porta livre, numa thread daemon, e o devolve já escutando"""
+    servidor = Servidor(manipulador, latencia, **estado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
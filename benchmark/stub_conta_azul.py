@@ -0,0 +1,65 @@
+import io
+import re
+import threading
+import gerador
+from servidor import Manipulador, iniciar
+
+# ===================== Conta Azul local =====================
+# Mesmos caminhos usados em conta_azul.py (EXPORT_URL e DETALHE_URL)
+ROTA_EXPORT = "/finance-pro-reports/v1/financial-statement-view/export"
+ROTA_DETALHE = re.compile(r"^/contaazul-bff/finance/v1/financial-events/([^/]+)/summary$")
+TIPO_CONTEUDO = {"csv": "text/csv", "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+
+
+def serializar(df, formato):
+    """Corpo do export, no mesmo formato dos arquivos do gerador"""
+    buffer = io.BytesIO()
+    gerador.salvar_export(df, buffer, formato)
+    return buffer.getvalue(), TIPO_CONTEUDO[formato]
+
+
+class ContaAzul(Manipulador):
+    def rotear(self, metodo):
+        caminho = self.path.split("?", 1)[0]
+        if metodo == "POST" and caminho == ROTA_EXPORT:
+            return self.exportar()
+        encontrado = ROTA_DETALHE.match(caminho)
+        if metodo == "GET" and encontrado:
+            return self.responder_json("summary", gerador.gerar_detalhe(encontrado.group(1), self.server.perfil))
+        self.nao_encontrado()
+
+    def exportar(self):
+        filtro = self.corpo_json()
+        tipo = (filtro.get("type") or ["EXPENSE"])[0]
+        status = (filtro.get("status") or ["ACQUITTED"])[0]
+        formato = "csv" if "text/csv" in (self.headers.get("Accept") or "") else "xlsx"
+        corpo, conteudo = self.server.export(tipo, status, filtro.get("dateFrom"), formato)
+        self.responder("export", 200, corpo, conteudo)
+
+
+class ServidorContaAzul:
+    """Gera cada export uma única vez (tipo, status, dateFrom, formato) e o reaproveita"""
+
+    def __init__(self, perfil):
+        self.perfil = perfil
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def export(self, tipo, status, date_from, formato):
+        chave = (tipo, status, date_from, formato)
+        with self._lock:
+            if chave not in self._cache:
+                df = gerador.gerar_export(tipo, status, self.perfil, date_from)
+                self._cache[chave] = serializar(df, formato)
+            return self._cache[chave]
+
+    def aquecer(self, tipos, formato):
+        """Gera os exports completos antes de medir, para não somar o tempo do gerador às etapas"""
+        for tipo in tipos:
+            for status in gerador.MIX_STATUS:
+                self.export(tipo, status, None, formato)
+
+
+def iniciar_conta_azul(perfil=None, latencia=0.0):
+    dados = ServidorContaAzul(perfil or gerador.perfil())
+    return iniciar(ContaAzul, latencia, export=dados.export, perfil=dados.perfil, dados=dados)
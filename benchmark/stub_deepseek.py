@@ -0,0 +1,37 @@
+import time
+from servidor import Manipulador, iniciar
+
+# ===================== DeepSeek (API compatível com OpenAI) local =====================
+RESPOSTA = """#### **Saúde financeira**
+Resposta sintética do benchmark.
+#### **Sinais de alerta**
+Resposta sintética do benchmark.
+#### **Oportunidades**
+Resposta sintética do benchmark.
+#### **Recomendações**
+Resposta sintética do benchmark."""
+
+
+class DeepSeek(Manipulador):
+    def rotear(self, metodo):
+        if metodo != "POST" or not self.path.rstrip("/").endswith("/chat/completions"):
+            return self.nao_encontrado()
+        pedido = self.corpo_json()
+        tamanho_prompt = sum(len(m.get("content", "")) for m in pedido.get("messages", []))
+        self.responder_json("chat.completions", {
+            "id": "benchmark",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": pedido.get("model", "deepseek-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": RESPOSTA},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": tamanho_prompt // 4, "completion_tokens": len(RESPOSTA) // 4,
+                      "total_tokens": (tamanho_prompt + len(RESPOSTA)) // 4},
+        })
+
+
+def iniciar_deepseek(latencia=0.0):
+    return iniciar(DeepSeek, latencia)
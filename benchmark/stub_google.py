@@ -0,0 +1,267 @@
+import re
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qs, unquote
+from servidor import Manipulador, iniciar
+
+# ===================== Sheets v4 / Drive v3 locais =====================
+# Cobre só o que o pipeline usa: files.list, spreadsheets.get/batchUpdate e values.*
+GRADE_PADRAO = {"rowCount": 1000, "columnCount": 26}
+ABA_PADRAO = "Página1"
+
+_A1 = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+_NUMERO = re.compile(r"^-?\d+(\.\d+)?([eE][-+]?\d+)?$")
+
+
+class ErroApi(Exception):
+    def __init__(self, codigo, mensagem):
+        super().__init__(mensagem)
+        self.codigo = codigo
+
+
+def _indice_coluna(letras):
+    n = 0
+    for letra in letras:
+        n = n * 26 + ord(letra) - 64
+    return n
+
+
+def separar_range(texto):
+    """'Aba'!A2:C → (título, referência); sem '!' a referência é a aba inteira"""
+    if texto.startswith("'"):
+        i = 1
+        while True:
+            i = texto.index("'", i)
+            if texto[i + 1:i + 2] == "'":
+                i += 2
+                continue
+            break
+        return texto[1:i].replace("''", "'"), texto[i + 2:]
+    titulo, _, ref = texto.partition("!")
+    return titulo, ref
+
+
+def limites(ref):
+    """Referência A1 → (linha0, coluna0, linha_fim, coluna_fim), 0-based com fim exclusivo (None = aberto)"""
+    if not ref:
+        return 0, 0, None, None
+    m = _A1.match(ref.upper())
+    if m is None:
+        raise ErroApi(400, f"Unable to parse range: {ref}")
+    c1, r1, c2, r2 = m.groups()
+    if m.group(0).find(":") < 0:
+        c2, r2 = c1, r1
+    return (
+        int(r1) - 1 if r1 else 0,
+        _indice_coluna(c1) - 1 if c1 else 0,
+        int(r2) if r2 else None,
+        _indice_coluna(c2) if c2 else None,
+    )
+
+
+def _aparar(linhas):
+    """Remove vazios no fim de cada linha e linhas vazias no fim, como a API faz"""
+    saida = []
+    for linha in linhas:
+        fim = len(linha)
+        while fim and linha[fim - 1] in (None, ""):
+            fim -= 1
+        saida.append(["" if v is None else v for v in linha[:fim]])
+    while saida and not saida[-1]:
+        saida.pop()
+    return saida
+
+
+def _renderizar(valor, renderizacao):
+    if renderizacao == "UNFORMATTED_VALUE" and isinstance(valor, str) and _NUMERO.match(valor):
+        numero = float(valor)
+        return int(numero) if numero.is_integer() and "." not in valor else numero
+    return valor if renderizacao == "UNFORMATTED_VALUE" else ("" if valor is None else str(valor))
+
+
+class Aba:
+    def __init__(self, sheet_id, titulo, indice, grade=None):
+        self.props = {"sheetId": sheet_id, "title": titulo, "index": indice, "gridProperties": dict(grade or GRADE_PADRAO)}
+        self.linhas = []
+        # Ranges (linha0, linha1, coluna0, coluna1) que receberam repeatCell, para conferir a formatação
+        self.formatadas = []
+
+    def ler(self, r0, c0, r1, c1):
+        grade = self.props["gridProperties"]
+        r1 = min(r1 or grade["rowCount"], len(self.linhas))
+        c1 = c1 or grade["columnCount"]
+        return _aparar([linha[c0:c1] for linha in self.linhas[r0:r1]])
+
+    def escrever(self, r0, c0, valores):
+        grade = self.props["gridProperties"]
+        largura = max((len(v) for v in valores), default=0)
+        if r0 + len(valores) > grade["rowCount"] or c0 + largura > grade["columnCount"]:
+            raise ErroApi(400, f"Range ('{self.props['title']}') exceeds grid limits. "
+                               f"Max rows: {grade['rowCount']}, max columns: {grade['columnCount']}")
+        if len(self.linhas) < r0 + len(valores):
+            self.linhas.extend([] for _ in range(r0 + len(valores) - len(self.linhas)))
+        for i, valores_linha in enumerate(valores):
+            linha = self.linhas[r0 + i]
+            if len(linha) < c0 + len(valores_linha):
+                linha.extend([None] * (c0 + len(valores_linha) - len(linha)))
+            linha[c0:c0 + len(valores_linha)] = [None if v == "" else v for v in valores_linha]
+
+    def limpar(self, r0, c0, r1, c1):
+        for linha in self.linhas[r0:r1]:
+            fim = len(linha) if c1 is None else min(c1, len(linha))
+            linha[c0:fim] = [None] * max(0, fim - c0)
+
+    def redimensionar(self, linhas, colunas):
+        self.props["gridProperties"].update(rowCount=linhas, columnCount=colunas)
+        del self.linhas[linhas:]
+        for linha in self.linhas:
+            del linha[colunas:]
+
+
+class Planilha:
+    def __init__(self):
+        self.abas = [Aba(0, ABA_PADRAO, 0)]
+        self.lock = threading.Lock()
+
+    def aba(self, titulo):
+        for aba in self.abas:
+            if aba.props["title"] == titulo:
+                return aba
+        raise ErroApi(400, f"Unable to parse range: {titulo}")
+
+    def resolver(self, texto):
+        titulo, ref = separar_range(texto)
+        return self.aba(titulo), limites(ref)
+
+    def reindexar(self):
+        self.abas.sort(key=lambda a: a.props["index"])
+        for i, aba in enumerate(self.abas):
+            aba.props["index"] = i
+
+    def batch_update(self, pedidos):
+        respostas = []
+        for pedido in pedidos:
+            tipo, corpo = next(iter(pedido.items()))
+            resposta = {}
+            if tipo == "addSheet":
+                props = corpo.get("properties", {})
+                if any(a.props["title"] == props.get("title") for a in self.abas):
+                    raise ErroApi(400, f"A sheet with the name \"{props.get('title')}\" already exists.")
+                sheet_id = props.get("sheetId", max(a.props["sheetId"] for a in self.abas) + 1 if self.abas else 0)
+                nova = Aba(sheet_id, props.get("title", f"Sheet{len(self.abas) + 1}"), len(self.abas), props.get("gridProperties"))
+                self.abas.append(nova)
+                resposta = {"addSheet": {"properties": nova.props}}
+            elif tipo == "deleteSheet":
+                self.abas = [a for a in self.abas if a.props["sheetId"] != corpo["sheetId"]]
+                self.reindexar()
+            elif tipo == "updateSheetProperties":
+                props = corpo["properties"]
+                aba = next(a for a in self.abas if a.props["sheetId"] == props["sheetId"])
+                campos = corpo.get("fields", "")
+                if "title" in campos:
+                    aba.props["title"] = props["title"]
+                if "gridProperties" in campos:
+                    grade = {**aba.props["gridProperties"], **props.get("gridProperties", {})}
+                    aba.redimensionar(grade["rowCount"], grade["columnCount"])
+                if re.search(r"(^|,)index(,|$)", campos):
+                    self.abas.remove(aba)
+                    self.abas.insert(props.get("index", 0), aba)
+                    for i, a in enumerate(self.abas):
+                        a.props["index"] = i
+            elif tipo == "repeatCell":
+                faixa = corpo["range"]
+                aba = next(a for a in self.abas if a.props["sheetId"] == faixa["sheetId"])
+                aba.formatadas.append((faixa.get("startRowIndex", 0), faixa.get("endRowIndex"),
+                                       faixa.get("startColumnIndex", 0), faixa.get("endColumnIndex")))
+            respostas.append(resposta)
+        return respostas
+
+
+class Google(Manipulador):
+    def rotear(self, metodo):
+        partes = urlsplit(self.path)
+        caminho, query = partes.path, parse_qs(partes.query)
+        try:
+            if caminho == "/drive/v3/files" and metodo == "GET":
+                return self.responder_json("drive.files.list", self.server.listar_arquivos(query.get("q", [""])[0]))
+
+            m = re.match(r"^/v4/spreadsheets/([^/:]+)(.*)$", caminho)
+            if m is None:
+                return self.nao_encontrado()
+            planilha = self.server.planilha(unquote(m.group(1)))
+            resto = m.group(2)
+            with planilha.lock:
+                rota, resposta = self.sheets(planilha, metodo, resto, query)
+            return self.responder_json(rota, resposta)
+        except ErroApi as e:
+            status = {400: "INVALID_ARGUMENT", 404: "NOT_FOUND"}.get(e.codigo, "UNKNOWN")
+            self.responder_json("erro", {"error": {"code": e.codigo, "message": str(e), "status": status}}, e.codigo)
+
+    def sheets(self, planilha, metodo, resto, query):
+        renderizacao = query.get("valueRenderOption", ["FORMATTED_VALUE"])[0]
+        if resto == "" and metodo == "GET":
+            return "sheets.get", {"sheets": [{"properties": a.props} for a in planilha.abas]}
+        if resto == ":batchUpdate":
+            return "sheets.batchUpdate", {"replies": planilha.batch_update(self.corpo_json().get("requests", []))}
+        if resto == "/values:batchUpdate":
+            corpo = self.corpo_json()
+            for item in corpo.get("data", []):
+                aba, (r0, c0, _, _) = planilha.resolver(item["range"])
+                aba.escrever(r0, c0, item.get("values", []))
+            return "values.batchUpdate", {"totalUpdatedRanges": len(corpo.get("data", []))}
+        if resto == "/values:batchClear":
+            ranges = self.corpo_json().get("ranges", [])
+            for texto in ranges:
+                aba, janela = planilha.resolver(texto)
+                aba.limpar(*janela)
+            return "values.batchClear", {"clearedRanges": ranges}
+        if resto == "/values:batchGet":
+            colunas = query.get("majorDimension", ["ROWS"])[0] == "COLUMNS"
+            faixas = [self.ler(planilha, texto, colunas, renderizacao) for texto in query.get("ranges", [])]
+            return "values.batchGet", {"valueRanges": faixas}
+        if resto.startswith("/values/"):
+            texto = unquote(resto[len("/values/"):])
+            if texto.endswith(":clear") and metodo == "POST":
+                aba, janela = planilha.resolver(texto[:-len(":clear")])
+                aba.limpar(*janela)
+                return "values.clear", {"clearedRange": texto[:-len(":clear")]}
+            if metodo == "PUT":
+                aba, (r0, c0, _, _) = planilha.resolver(texto)
+                aba.escrever(r0, c0, self.corpo_json().get("values", []))
+                return "values.update", {"updatedRange": texto}
+            return "values.get", self.ler(planilha, texto, False, renderizacao)
+        raise ErroApi(404, f"Rota não emulada: {metodo} {resto}")
+
+    @staticmethod
+    def ler(planilha, texto, colunas, renderizacao):
+        aba, janela = planilha.resolver(texto)
+        linhas = aba.ler(*janela)
+        if colunas:
+            largura = max((len(l) for l in linhas), default=0)
+            linhas = _aparar([[l[j] if j < len(l) else None for l in linhas] for j in range(largura)])
+        faixa = {"range": texto, "majorDimension": "COLUMNS" if colunas else "ROWS"}
+        if linhas:
+            faixa["values"] = [[_renderizar(v, renderizacao) for v in l] for l in linhas]
+        return faixa
+
+
+class EstadoGoogle:
+    """Planilhas em memória, criadas no primeiro acesso (qualquer id ou nome de arquivo existe)"""
+
+    def __init__(self):
+        self.planilhas = {}
+        self.lock = threading.Lock()
+
+    def planilha(self, spreadsheet_id):
+        with self.lock:
+            return self.planilhas.setdefault(spreadsheet_id, Planilha())
+
+    def listar_arquivos(self, q):
+        nome = re.search(r"name='((?:[^'\\]|\\.)*)'", q)
+        nome = nome.group(1) if nome else "arquivo"
+        return {"files": [{"id": "emu-" + hashlib.sha1(nome.encode()).hexdigest()[:24], "name": nome}]}
+
+
+def iniciar_google(latencia=0.0):
+    estado = EstadoGoogle()
+    return iniciar(Google, latencia, planilha=estado.planilha, listar_arquivos=estado.listar_arquivos, estado=estado)
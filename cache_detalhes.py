@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+import pandas as pd
+import detalhes_eventos
+from sync_incremental import ESTADO_DIR
+
+# ===================== Configurações =====================
+# Resumos de financial-events já buscados, por id
+ARQUIVO_CACHE_DETALHES = os.path.join(ESTADO_DIR, "detalhes.sqlite")
+
+# Eventos liquidados não mudam mais: o resumo guardado vale enquanto a linha base não mudar
+STATUS_LIQUIDADOS = {"ACQUITTED", "CONCILIATED"}
+# Mesmo liquidado, o resumo é renovado depois deste prazo
+DETALHE_CACHE_DIAS = float(os.getenv("DETALHE_CACHE_DIAS", "30"))
+
+
+def conectar(arquivo=None):
+    """Abre o banco do cache de detalhes, criando a tabela se necessário"""
+    arquivo = arquivo or ARQUIVO_CACHE_DETALHES
+    os.makedirs(os.path.dirname(arquivo) or ".", exist_ok=True)
+    conn = sqlite3.connect(arquivo, timeout=60)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS detalhes (
+            id TEXT PRIMARY KEY,
+            hash_base TEXT NOT NULL,
+            liquidado INTEGER NOT NULL,
+            buscado_em REAL NOT NULL,
+            payload TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+def assinaturas(df_base, col_id="financialEvent.id", col_status="status"):
+    """Hash das linhas base de cada evento e se ele já está liquidado (todas as parcelas)"""
+    base = df_base[df_base[col_id].notna() & (df_base[col_id].astype(str) != "")]
+    ids = base[col_id].astype(str)
+    hashes = pd.util.hash_pandas_object(base.astype(str), index=False)
+    # Soma (com overflow) é independente da ordem das linhas do evento
+    hash_evento = hashes.groupby(ids.to_numpy()).sum().map(lambda h: f"{int(h):016x}")
+    if col_status in base.columns:
+        liquidado = base[col_status].astype(str).isin(STATUS_LIQUIDADOS).groupby(ids.to_numpy()).all()
+    else:
+        liquidado = pd.Series(False, index=hash_evento.index)
+    # Mantém a ordem de primeira aparição na base
+    return {fid: (hash_evento[fid], bool(liquidado[fid])) for fid in pd.unique(ids.to_numpy())}
+
+
+def carregar(ids, arquivo=None):
+    """Entradas guardadas para os ids pedidos"""
+    ids = list(ids)
+    entradas = {}
+    with closing(conectar(arquivo)) as conn:
+        # Consulta em blocos para não estourar o limite de parâmetros do SQLite
+        for i in range(0, len(ids), 900):
+            bloco = ids[i:i + 900]
+            marcadores = ",".join("?" * len(bloco))
+            for fid, hash_base, liquidado, buscado_em, payload in conn.execute(
+                f"SELECT id, hash_base, liquidado, buscado_em, payload FROM detalhes WHERE id IN ({marcadores})", bloco
+            ):
+                entradas[fid] = {"hash_base": hash_base, "liquidado": bool(liquidado), "buscado_em": buscado_em, "payload": payload}
+    return entradas
+
+
+def fresco(entrada, assinatura, agora=None):
+    """O resumo guardado ainda vale? Só para eventos liquidados, com a linha base igual e dentro do prazo"""
+    hash_base, liquidado = assinatura
+    agora = agora or time.time()
+    return (
+        liquidado
+        and entrada["liquidado"]
+        and entrada["hash_base"] == hash_base
+        and agora - entrada["buscado_em"] < DETALHE_CACHE_DIAS * 86400
+    )
+
+
+def salvar(detalhes, assinaturas_eventos, arquivo=None):
+    """Grava os resumos recém-buscados e descarta os vencidos"""
+    agora = time.time()
+    linhas = []
+    for fid, payload in detalhes.items():
+        hash_base, liquidado = assinaturas_eventos[fid]
+        linhas.append((fid, hash_base, int(liquidado), agora, json.dumps(payload, ensure_ascii=False)))
+    with closing(conectar(arquivo)) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO detalhes (id, hash_base, liquidado, buscado_em, payload) VALUES (?, ?, ?, ?, ?)",
+            linhas,
+        )
+        conn.execute("DELETE FROM detalhes WHERE buscado_em < ?", (agora - DETALHE_CACHE_DIAS * 86400,))
+
+
+def obter_detalhes(df_base, col_id="financialEvent.id", col_status="status", arquivo=None):
+    """Resumos de todos os eventos da base: do cache quando frescos, da API para novos e abertos
+
+    Se a API falhar para um id que tem resumo antigo guardado, usa o antigo em vez de perder a linha.
+    Devolve ({id: payload} na ordem da base, {id: motivo} dos que ficaram sem resumo).
+    """
+    eventos = assinaturas(df_base, col_id, col_status)
+    entradas = carregar(eventos, arquivo)
+    agora = time.time()
+    validos = {fid: e for fid, e in entradas.items() if fresco(e, eventos[fid], agora)}
+    buscar = [fid for fid in eventos if fid not in validos]
+    print(f"🗃️ Cache de detalhes: {len(validos)} reaproveitados, {len(buscar)} a buscar na API")
+
+    novos, falhas = detalhes_eventos.buscar_detalhes(buscar) if buscar else ({}, {})
+    salvar(novos, eventos, arquivo)
+
+    antigos = [fid for fid in falhas if fid in entradas]
+    if antigos:
+        print(f"  ♻️ {len(antigos)} IDs com falha usarão o resumo guardado anteriormente")
+
+    detalhes = {}
+    for fid in eventos:
+        if fid in novos:
+            detalhes[fid] = novos[fid]
+        elif fid in entradas and (fid in validos or fid in falhas):
+            detalhes[fid] = json.loads(entradas[fid]["payload"])
+    return detalhes, {fid: motivo for fid, motivo in falhas.items() if fid not in entradas}
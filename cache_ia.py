@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+import instrumentacao
+from sync_incremental import ESTADO_DIR
+
+# ===================== Configurações =====================
+# Respostas da IA indexadas pelo hash do pedido (modelo, mensagens e parâmetros)
+ARQUIVO_CACHE_IA = os.path.join(ESTADO_DIR, "cache_ia.sqlite")
+CACHE_IA_TTL_DIAS = float(os.getenv("CACHE_IA_TTL_DIAS", "30"))
+CACHE_IA_MAX_ENTRADAS = int(os.getenv("CACHE_IA_MAX_ENTRADAS", "200"))
+
+
+def conectar(arquivo=None):
+    """Abre o banco do cache, criando a tabela se necessário"""
+    arquivo = arquivo or ARQUIVO_CACHE_IA
+    os.makedirs(os.path.dirname(arquivo) or ".", exist_ok=True)
+    conn = sqlite3.connect(arquivo, timeout=60)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS respostas (
+            chave TEXT PRIMARY KEY,
+            modelo TEXT NOT NULL,
+            conteudo TEXT NOT NULL,
+            criado_em REAL NOT NULL,
+            usado_em REAL NOT NULL
+        )
+    """)
+    return conn
+
+
+def chave(modelo, mensagens, **parametros):
+    """Hash SHA-256 do pedido completo; qualquer mudança nos dados ou no prompt gera outra chave"""
+    pedido = {"modelo": modelo, "mensagens": mensagens, "parametros": parametros}
+    texto = json.dumps(pedido, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def buscar(chave_pedido, ttl_dias=CACHE_IA_TTL_DIAS, arquivo=None):
+    """Resposta guardada para a chave, ou None se não houver ou estiver vencida"""
+    agora = time.time()
+    with closing(conectar(arquivo)) as conn, conn:
+        linha = conn.execute(
+            "SELECT conteudo FROM respostas WHERE chave = ? AND criado_em >= ?",
+            (chave_pedido, agora - ttl_dias * 86400),
+        ).fetchone()
+        if linha is not None:
+            conn.execute("UPDATE respostas SET usado_em = ? WHERE chave = ?", (agora, chave_pedido))
+    return None if linha is None else linha[0]
+
+
+def guardar(chave_pedido, modelo, conteudo, ttl_dias=CACHE_IA_TTL_DIAS, max_entradas=CACHE_IA_MAX_ENTRADAS, arquivo=None):
+    """Guarda a resposta e descarta as vencidas e as menos usadas além do limite"""
+    agora = time.time()
+    with closing(conectar(arquivo)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO respostas (chave, modelo, conteudo, criado_em, usado_em) VALUES (?, ?, ?, ?, ?)",
+            (chave_pedido, modelo, conteudo, agora, agora),
+        )
+        conn.execute("DELETE FROM respostas WHERE criado_em < ?", (agora - ttl_dias * 86400,))
+        conn.execute(
+            "DELETE FROM respostas WHERE chave NOT IN (SELECT chave FROM respostas ORDER BY usado_em DESC LIMIT ?)",
+            (max_entradas,),
+        )
+
+
+def completar(client, modelo, mensagens, arquivo=None, **parametros):
+    """chat.completions.create com cache: pedidos idênticos reaproveitam a resposta guardada"""
+    chave_pedido = chave(modelo, mensagens, **parametros)
+    conteudo = buscar(chave_pedido, arquivo=arquivo)
+    if conteudo is not None:
+        print(f"♻️ Análise reaproveitada do cache ({chave_pedido[:12]})")
+        return conteudo
+
+    response = client.chat.completions.create(model=modelo, messages=mensagens, **parametros)
+    conteudo = response.choices[0].message.content
+    # O cliente da OpenAI usa httpx; a chamada é contada aqui, com os tamanhos aproximados do pedido e da resposta
+    instrumentacao.registrar_http(
+        instrumentacao.host_da_url(getattr(client, "base_url", "")),
+        len(json.dumps(mensagens, ensure_ascii=False).encode("utf-8")),
+        len((conteudo or "").encode("utf-8")),
+    )
+    guardar(chave_pedido, modelo, conteudo, arquivo=arquivo)
+    return conteudo
@@ -0,0 +1,130 @@
+import re
+import numpy as np
+import pandas as pd
+
+# ===================== Configurações =====================
+SEM_CENTRO = "Sem Centro de Custo"
+PADRAO_CENTRO = re.compile(r"^Centro de Custo (\d+)$")
+PREFIXO_VALOR = "Valor no Centro de Custo "
+
+
+def pares_centro_valor(df):
+    """Pares (Centro de Custo N, Valor no Centro de Custo N) presentes no DataFrame, em ordem de N"""
+    pares = []
+    for col in df.columns:
+        encontrado = PADRAO_CENTRO.match(str(col))
+        if not encontrado:
+            continue
+        col_valor = f"{PREFIXO_VALOR}{encontrado.group(1)}"
+        if col_valor not in df.columns:
+            print(f"  ⚠️ Coluna '{col_valor}' não encontrada, pulando...")
+            continue
+        pares.append((int(encontrado.group(1)), col, col_valor))
+    return [(col, col_valor) for _, col, col_valor in sorted(pares)]
+
+
+def _vazios(bloco):
+    """Máscara 2-D de valores vazios: nulo, texto vazio ou zero"""
+    vazio = pd.isna(bloco)
+    if bloco.dtype == object:
+        vazio |= (bloco == "") | (bloco == 0)
+    else:
+        vazio |= bloco == 0
+    return vazio
+
+
+def corrigir_valor_categoria(df):
+    """Limita categoriesRatio.value ao valor pago (paid) quando ele for maior"""
+    if 'categoriesRatio.value' not in df.columns or 'paid' not in df.columns:
+        return df
+    print("💰 Corrigindo valores de categoriesRatio.value...")
+    valor = pd.to_numeric(df['categoriesRatio.value'], errors='coerce').to_numpy(dtype=float)
+    pago = pd.to_numeric(df['paid'], errors='coerce').to_numpy(dtype=float)
+    # Comparações com NaN dão False, então só troca quando os dois valores existem
+    acima = valor > pago
+    df['categoriesRatio.value'] = df['categoriesRatio.value'].mask(acima, df['paid'])
+    return df
+
+
+def normalizar_centros_de_custo(df):
+    """Preenche 'Sem Centro de Custo' em todos os pares centro/valor numa única passada 2-D
+
+    Centro vazio com valor preenchido recebe só o nome; no primeiro par, centro e valor
+    vazios recebem o nome e o valor pago (paid). Os nomes são normalizados para texto sem
+    espaços nas pontas e os centros vazios que sobram ficam nulos.
+    """
+    pares = pares_centro_valor(df)
+    print(f"  Encontradas {len(pares)} colunas de centro de custo para processar")
+    if not pares or 'paid' not in df.columns:
+        print("  ⚠️ Colunas necessárias não encontradas para tratamento de centro de custo")
+        return df
+
+    colunas_centro = [c for c, _ in pares]
+    colunas_valor = [v for _, v in pares]
+
+    centros = df[colunas_centro].to_numpy(dtype=object)
+    nulos = pd.isna(centros)
+    texto = np.char.strip(centros.astype(str))
+    centro_vazio = nulos | (texto == "") | (texto == "nan")
+    valor_vazio = _vazios(df[colunas_valor].to_numpy())
+
+    # Caso 1: centro e valor vazios, só no primeiro par → centro + valor copiado de 'paid'
+    ambos_vazios = centro_vazio[:, 0] & valor_vazio[:, 0]
+    # Caso 2: centro vazio mas valor existe (todos os pares) → só o centro
+    so_centro = centro_vazio & ~valor_vazio
+    preencher = so_centro.copy()
+    preencher[:, 0] |= ambos_vazios
+
+    resultado = texto.astype(object)
+    resultado[centro_vazio] = np.nan
+    resultado[preencher] = SEM_CENTRO
+    df[colunas_centro] = pd.DataFrame(resultado, index=df.index, columns=colunas_centro)
+    if ambos_vazios.any():
+        df[colunas_valor[0]] = df[colunas_valor[0]].mask(ambos_vazios, df['paid'])
+
+    for col, n in zip(colunas_centro, so_centro.sum(axis=0)):
+        if n:
+            print(f"  ✅ '{col}': {n} registros preenchidos (apenas centro, valor mantido)")
+
+    print("\n  📊 Resumo do tratamento:")
+    print(f"    Registros com centro + valor preenchidos (apenas Centro 1): {int(ambos_vazios.sum())}")
+    print(f"    Registros com apenas centro preenchido (todos os centros): {int(so_centro.sum())}")
+    return df
+
+
+def pivotar(df):
+    """Uma linha por par centro/valor preenchido (Centro_de_Custo_Unificado + paid_new)
+
+    Empilha os pares numa matriz 2-D, descarta os centros vazios antes de montar a saída
+    e só repete as colunas de identificação para as linhas que sobraram. A ordem segue a
+    do melt: todas as linhas do Centro 1, depois as do Centro 2, e assim por diante.
+    """
+    pares = pares_centro_valor(df)
+    colunas_pivot = {c for c in df.columns if str(c).startswith("Centro de Custo ") or str(c).startswith(PREFIXO_VALOR)}
+    colunas_id = [c for c in df.columns if c not in colunas_pivot]
+
+    centros = df[[c for c, _ in pares]].to_numpy(dtype=object)
+    valores = np.abs(np.column_stack([
+        pd.to_numeric(df[v], errors='coerce').to_numpy(dtype=float) for _, v in pares
+    ])) if pares else np.empty((len(df), 0))
+
+    texto = np.char.strip(centros.astype(str))
+    preenchido = ~pd.isna(centros) & (texto != "") & (texto != "nan")
+
+    # Transposta para percorrer centro a centro, como o melt fazia
+    par, linha = np.nonzero(preenchido.T)
+    df_final = df[colunas_id].take(linha).reset_index(drop=True)
+    df_final['Centro_de_Custo_Unificado'] = centros[linha, par]
+    df_final['paid_new'] = valores[linha, par]
+    return df_final
+
+
+def somar_por_centro(df, chaves=("tipo", "id", "Centro_de_Custo_Unificado")):
+    """Uma linha por lançamento e centro: o mesmo centro repetido num rateio tem os valores somados"""
+    repetidas = df.duplicated(subset=list(chaves), keep=False)
+    if not repetidas.any():
+        return df
+    outras = {c: "first" for c in df.columns if c not in chaves}
+    outras["paid_new"] = "sum"
+    somadas = df[repetidas].groupby(list(chaves), observed=True, sort=False, as_index=False).agg(outras)
+    return pd.concat([df[~repetidas], somadas[df.columns]], ignore_index=True)
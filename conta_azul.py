@@ -0,0 +1,140 @@
+import os
+import json
+import tempfile
+import pandas as pd
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+import instrumentacao
+
+# ===================== Configurações =====================
+# Base configurável para apontar para um servidor local (ex.: benchmark)
+CONTA_AZUL_URL = os.getenv("CONTA_AZUL_URL", "https://services.contaazul.com").rstrip("/")
+EXPORT_URL = f"{CONTA_AZUL_URL}/finance-pro-reports/v1/financial-statement-view/export"
+DETALHE_URL = CONTA_AZUL_URL + "/contaazul-bff/finance/v1/financial-events/{fid}/summary"
+HEADERS = {
+    'x-authorization': 'ba461980-c757-46d2-a70f-5ab6b2dcdb29',
+    'Content-Type': 'application/json',
+    'User-Agent': 'Mozilla/5.0'
+}
+
+# Lista de status para processar
+STATUS_LIST = ["ACQUITTED", "PARTIAL", "PENDING", "LOST", "RENEGOTIATED", "CONCILIATED", "OVERDUE"]
+
+# Downloads simultâneos e tempo limite (conexão, leitura) de cada requisição
+MAX_WORKERS = int(os.getenv("CONTA_AZUL_MAX_WORKERS", "7"))
+TIMEOUT = (10, float(os.getenv("CONTA_AZUL_TIMEOUT", "180")))
+
+# Formato pedido ao endpoint de export (xlsx ou csv); a resposta é lida pelo que de fato chegar
+FORMATO_EXPORT = os.getenv("CONTA_AZUL_FORMATO", "xlsx")
+TAMANHO_BLOCO = 1024 * 1024
+
+try:
+    import python_calamine  # noqa: F401
+    ENGINE_XLSX = "calamine"
+except ImportError:
+    ENGINE_XLSX = "openpyxl"
+
+
+def criar_sessao(max_conexoes=MAX_WORKERS):
+    """Cria uma sessão HTTP com pool de conexões keep-alive para a Conta Azul"""
+    sessao = requests.Session()
+    sessao.headers.update(HEADERS)
+    sessao.hooks["response"].append(instrumentacao.hook_requests)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexoes)
+    sessao.mount("https://", adapter)
+    sessao.mount("http://", adapter)
+    return sessao
+
+
+def baixar_status(sessao, tipo, status_atual, timeout=TIMEOUT, date_from=None):
+    """Baixa (em streaming para disco) e lê o export de um tipo (EXPENSE/REVENUE) e um status"""
+    payload = json.dumps({
+        "dateFrom": date_from,
+        "dateTo": None,
+        "quickFilter": "ALL",
+        "search": "",
+        "status": [status_atual],
+        "type": [tipo]
+    })
+
+    headers = {"Accept": "text/csv"} if FORMATO_EXPORT == "csv" else None
+    with instrumentacao.etapa(f"conta_azul/{tipo}/{status_atual}/download"):
+        with sessao.post(EXPORT_URL, data=payload, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            caminho = salvar_em_disco(response)
+
+    try:
+        with instrumentacao.etapa(f"conta_azul/{tipo}/{status_atual}/leitura"):
+            df = ler_export(caminho)
+    finally:
+        os.unlink(caminho)
+
+    df['status'] = status_atual
+    return df
+
+
+def salvar_em_disco(response):
+    """Grava o corpo da resposta em um arquivo temporário, bloco a bloco, sem mantê-lo em memória"""
+    with tempfile.NamedTemporaryFile(prefix="export_", delete=False) as arquivo:
+        try:
+            for bloco in response.iter_content(chunk_size=TAMANHO_BLOCO):
+                arquivo.write(bloco)
+        except BaseException:
+            arquivo.close()
+            os.unlink(arquivo.name)
+            raise
+        return arquivo.name
+
+
+def ler_export(caminho):
+    """Lê o export baixado: XLSX (assinatura ZIP) com o engine mais rápido disponível, ou CSV"""
+    with open(caminho, "rb") as arquivo:
+        inicio = arquivo.read(4096)
+
+    if inicio.startswith(b"PK"):
+        return pd.read_excel(caminho, engine=ENGINE_XLSX)
+
+    # CSV brasileiro usa ';' como separador e ',' como decimal
+    primeira_linha = inicio.split(b"\n", 1)[0]
+    if primeira_linha.count(b";") > primeira_linha.count(b","):
+        return pd.read_csv(caminho, sep=";", decimal=",", thousands=".", encoding="utf-8-sig")
+    return pd.read_csv(caminho, encoding="utf-8-sig")
+
+
+def baixar_exports(tipo, status_list=STATUS_LIST, max_workers=MAX_WORKERS, timeout=TIMEOUT, sessao=None, janelas=None):
+    """Baixa em paralelo os exports de todos os status e devolve os DataFrames na ordem de status_list
+
+    janelas: dicionário opcional {status: dateFrom} para limitar o período de alguns status
+    """
+    janelas = janelas or {}
+    sessao_propria = sessao is None
+    if sessao_propria:
+        sessao = criar_sessao(max_workers)
+
+    resultados = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(status_list)))) as executor:
+            futures = {
+                executor.submit(baixar_status, sessao, tipo, status_atual, timeout, janelas.get(status_atual)): status_atual
+                for status_atual in status_list
+            }
+            for future in as_completed(futures):
+                status_atual = futures[future]
+                try:
+                    df = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"  ⚠️ Erro ao baixar dados para {status_atual}: {e}")
+                    continue
+                except Exception as e:
+                    print(f"  ⚠️ Erro ao processar arquivo XLSX para {status_atual}: {e}")
+                    continue
+
+                print(f"  ✅ {len(df)} registros baixados para {status_atual}")
+                resultados[status_atual] = df
+    finally:
+        if sessao_propria:
+            sessao.close()
+
+    # Mantém a ordem original dos status para que o drop_duplicates(keep='first') não mude
+    return [resultados[s] for s in status_list if s in resultados]
@@ -0,0 +1,112 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+
+# ===================== Formatos conhecidos =====================
+# Regex de detecção → formato da parte de data (a hora, se houver, é descartada)
+FORMATOS_DATA = [
+    (r"^\d{2}/\d{2}/\d{4}", "%d/%m/%Y"),
+    (r"^\d{4}-\d{2}-\d{2}", "%Y-%m-%d"),
+    (r"^\d{4}/\d{2}/\d{2}", "%Y/%m/%d"),
+]
+
+# Datas numéricas do Sheets (SERIAL_NUMBER) contam dias a partir desta origem
+ORIGEM_SERIAL = "1899-12-30"
+
+# Textos que representam vazio e não devem gerar aviso
+VAZIOS = {"", "nan", "NaN", "NaT", "None", "null"}
+
+
+def _unicos(serie):
+    """Códigos por linha (-1 = nulo) e valores únicos como Series object"""
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    return codigos, pd.Series(np.asarray(unicos, dtype=object), dtype=object)
+
+
+def _expandir(resultado, codigos, nulo):
+    """Leva o resultado dos valores únicos de volta às linhas (código -1 = nulo)"""
+    valores = np.full(len(codigos), nulo, dtype=resultado.dtype)
+    validos = codigos >= 0
+    valores[validos] = resultado.to_numpy()[codigos[validos]]
+    return valores
+
+
+def _eh_numero(valores):
+    return valores.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, bool))
+
+
+def _avisar(rotulo, texto, falhou):
+    """Informa quantos valores não puderam ser convertidos, em vez de virarem NaT/NaN calados"""
+    perdidos = texto[falhou & ~texto.isin(VAZIOS)]
+    if len(perdidos):
+        exemplos = ", ".join(repr(v) for v in perdidos.head(3))
+        print(f"  ⚠️ {rotulo}: {len(perdidos)} valores não reconhecidos (ex.: {exemplos})")
+
+
+def datas(serie, dayfirst=True, nome=None):
+    """Converte datas em texto, objetos date/datetime ou seriais do Sheets para datetime64
+
+    Detecta dd/mm/AAAA e AAAA-MM-DD e converte cada formato de uma vez, só sobre os
+    valores únicos (datas se repetem muito). O que sobrar passa pelo parser genérico.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    codigos, unicos = _unicos(serie)
+    resultado = pd.Series(pd.NaT, index=unicos.index, dtype="datetime64[ns]")
+
+    numeros = _eh_numero(unicos)
+    objetos = unicos.map(lambda v: isinstance(v, (date, pd.Timestamp)))
+    if numeros.any():
+        resultado[numeros] = pd.to_datetime(unicos[numeros].astype(float), unit="D", origin=ORIGEM_SERIAL, errors="coerce")
+    if objetos.any():
+        resultado[objetos] = pd.to_datetime(unicos[objetos].tolist(), errors="coerce")
+
+    texto = unicos.astype(str).str.strip()
+    pendentes = ~(numeros | objetos)
+    for regex, formato in FORMATOS_DATA:
+        mascara = pendentes & texto.str.match(regex)
+        if mascara.any():
+            resultado[mascara] = pd.to_datetime(texto[mascara].str[:10], format=formato, errors="coerce")
+            pendentes &= ~mascara
+
+    restantes = pendentes & ~texto.isin(VAZIOS)
+    if restantes.any():
+        resultado[restantes] = pd.to_datetime(texto[restantes], format="mixed", dayfirst=dayfirst, errors="coerce")
+
+    _avisar(nome or serie.name or "datas", texto, resultado.isna())
+
+    valores = _expandir(resultado, codigos, np.datetime64("NaT"))
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+def dinheiro(serie, nome=None):
+    """Converte valores monetários (R$ 1.234,56, 1234.56, 1.234.567) para float64
+
+    Vírgula indica formato brasileiro. Sem vírgula, pontos só são milhar quando há mais de um
+    grupo (1.234.567) ou quando a coluna usa vírgula decimal em outros valores; "12.345" sozinho
+    é um float (como o repr gravado na planilha). A conversão é feita só sobre os valores únicos.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    codigos, unicos = _unicos(serie)
+
+    numeros = _eh_numero(unicos)
+    texto = unicos.astype(str).str.strip()
+    negativo = texto.str.startswith("(") & texto.str.endswith(")")
+    limpo = texto.str.replace(r"[^\d,.\-]", "", regex=True)
+
+    brasileiro = limpo.str.contains(",", regex=False)
+    grupos = limpo.str.fullmatch(r"-?\d{1,3}(\.\d{3})+")
+    milhar = ~brasileiro & grupos & (brasileiro.any() | limpo.str.fullmatch(r"-?\d{1,3}(\.\d{3}){2,}"))
+    limpo = limpo.where(~(brasileiro | milhar), limpo.str.replace(".", "", regex=False))
+    limpo = limpo.where(~brasileiro, limpo.str.replace(",", ".", regex=False))
+
+    resultado = pd.to_numeric(limpo, errors="coerce").astype("float64")
+    resultado[negativo] = -resultado[negativo].abs()
+    if numeros.any():
+        resultado[numeros] = unicos[numeros].astype(float)
+
+    _avisar(nome or serie.name or "valores", texto, resultado.isna())
+
+    valores = _expandir(resultado, codigos, np.nan)
+    return pd.Series(valores, index=serie.index, name=serie.name)
@@ -0,0 +1,92 @@
+import os
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# ===================== Configurações =====================
+# Cotas do Sheets: 60 leituras e 60 escritas por minuto por usuário; 300 de cada por minuto no projeto
+SHEETS_LEITURAS_POR_MINUTO = int(os.getenv("SHEETS_LEITURAS_POR_MINUTO", "60"))
+SHEETS_ESCRITAS_POR_MINUTO = int(os.getenv("SHEETS_ESCRITAS_POR_MINUTO", "60"))
+SHEETS_LEITURAS_PROJETO_POR_MINUTO = int(os.getenv("SHEETS_LEITURAS_PROJETO_POR_MINUTO", "300"))
+SHEETS_ESCRITAS_PROJETO_POR_MINUTO = int(os.getenv("SHEETS_ESCRITAS_PROJETO_POR_MINUTO", "300"))
+# Drive: consultas por minuto por usuário e no projeto
+DRIVE_POR_MINUTO = int(os.getenv("DRIVE_POR_MINUTO", "1000"))
+DRIVE_PROJETO_POR_MINUTO = int(os.getenv("DRIVE_PROJETO_POR_MINUTO", "12000"))
+
+# Teto da espera entre tentativas, em segundos
+GOOGLE_ESPERA_MAXIMA = float(os.getenv("GOOGLE_ESPERA_MAXIMA", "64"))
+
+
+class Cota:
+    """Token bucket: libera até `por_minuto` requisições por minuto, com rajadas de até `rajada`"""
+
+    def __init__(self, por_minuto, rajada=None):
+        self.taxa = por_minuto / 60.0
+        self.capacidade = float(rajada or max(1, por_minuto // 6))
+        self.tokens = self.capacidade
+        self.ultimo = time.monotonic()
+        self.pausada_ate = 0.0
+        self.lock = threading.Lock()
+
+    def consumir(self, n=1):
+        """Bloqueia até haver n tokens disponíveis"""
+        while True:
+            with self.lock:
+                agora = time.monotonic()
+                if agora < self.pausada_ate:
+                    espera = self.pausada_ate - agora
+                else:
+                    self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+                    self.ultimo = agora
+                    if self.tokens >= n:
+                        self.tokens -= n
+                        return
+                    espera = (n - self.tokens) / self.taxa
+            time.sleep(espera)
+
+    def pausar(self, segundos):
+        """Após um 429, segura todas as threads pelo tempo pedido e recomeça com o balde vazio"""
+        with self.lock:
+            self.pausada_ate = max(self.pausada_ate, time.monotonic() + segundos)
+            self.tokens = 0.0
+            self.ultimo = self.pausada_ate
+
+
+class Cotas:
+    """Cotas que valem ao mesmo tempo (por usuário e por projeto): cada requisição consome de todas"""
+
+    def __init__(self, *cotas):
+        self.cotas = cotas
+
+    def consumir(self, n=1):
+        for cota in self.cotas:
+            cota.consumir(n)
+
+    def pausar(self, segundos):
+        for cota in self.cotas:
+            cota.pausar(segundos)
+
+
+def espera_retentativa(tentativa, retry_after=None, maximo=GOOGLE_ESPERA_MAXIMA):
+    """Espera antes da próxima tentativa: o Retry-After (segundos ou data HTTP) quando vier,
+    senão backoff exponencial com jitter (metade fixa, metade aleatória)"""
+    if retry_after:
+        try:
+            segundos = float(retry_after)
+        except ValueError:
+            try:
+                segundos = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                segundos = None
+        if segundos is not None:
+            return min(maximo, max(0.0, segundos)) + random.uniform(0, 1)
+    teto = min(maximo, 2 ** tentativa)
+    return teto / 2 + random.uniform(0, teto / 2)
+
+
+# Compartilhadas por todas as threads do processo
+leitura_sheets = Cotas(Cota(SHEETS_LEITURAS_POR_MINUTO), Cota(SHEETS_LEITURAS_PROJETO_POR_MINUTO))
+escrita_sheets = Cotas(Cota(SHEETS_ESCRITAS_POR_MINUTO), Cota(SHEETS_ESCRITAS_PROJETO_POR_MINUTO))
+drive = Cotas(Cota(DRIVE_POR_MINUTO), Cota(DRIVE_PROJETO_POR_MINUTO))
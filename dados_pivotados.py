@@ -0,0 +1,86 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from datetime import datetime
+import esquema
+import google_clients
+import snapshots
+from publicacao import coluna_letra, ref_aba
+
+# ===================== Configurações =====================
+SPREADSHEET_ID = "1xwp9gIz0lV4mW5geUBESj1W59QSySdVYipThXAOUgrU"
+ABA = "Dados_Pivotados"
+SNAPSHOT = "dados_pivotados"
+
+# Colunas usadas pela análise (tipos declarados em esquema.py)
+COLUNAS = [
+    "tipo",
+    "status",
+    "categoriesRatio.category",
+    "paid_new",
+    "lastAcquittanceDate",
+    "dueDate",
+]
+COL_DATA_FILTRO = "lastAcquittanceDate"
+
+
+def _filtro_ano(tabela, col, ano):
+    """Máscara Arrow das linhas do ano, calculada antes de converter para pandas"""
+    coluna = tabela.column(col)
+    if pa.types.is_timestamp(coluna.type) or pa.types.is_date(coluna.type):
+        mascara = pc.equal(pc.year(coluna), ano)
+    elif pa.types.is_string(coluna.type) or pa.types.is_large_string(coluna.type):
+        mascara = pc.starts_with(coluna, pattern=f"{ano}-")
+    else:
+        return None
+    return pc.fill_null(mascara, False)
+
+
+def do_snapshot(colunas, ano):
+    """Lê só as colunas pedidas do snapshot local e filtra o ano ainda no Arrow"""
+    tabela = snapshots.carregar_tabela(SNAPSHOT)
+    if tabela is None:
+        return None
+    tabela = tabela.select([c for c in colunas if c in tabela.column_names])
+    if ano is not None and COL_DATA_FILTRO in tabela.column_names:
+        mascara = _filtro_ano(tabela, COL_DATA_FILTRO, ano)
+        if mascara is not None:
+            tabela = tabela.filter(mascara)
+    print(f"💾 Usando snapshot local '{SNAPSHOT}' ({tabela.num_rows} registros)")
+    return tabela.to_pandas()
+
+
+def da_planilha(colunas):
+    """Lê só as colunas pedidas da aba Dados_Pivotados, com valores não formatados"""
+    sheets = google_clients.sheets_service().spreadsheets().values()
+    cabecalho = google_clients.executar(sheets.get(spreadsheetId=SPREADSHEET_ID, range=f"{ref_aba(ABA)}!1:1"))
+    cabecalho = cabecalho.get("values", [[]])[0]
+    posicoes = {c: cabecalho.index(c) + 1 for c in colunas if c in cabecalho}
+
+    ranges = [f"{ref_aba(ABA)}!{coluna_letra(p)}2:{coluna_letra(p)}" for p in posicoes.values()]
+    resposta = google_clients.executar(sheets.batchGet(
+        spreadsheetId=SPREADSHEET_ID, ranges=ranges, majorDimension="COLUMNS",
+        valueRenderOption="UNFORMATTED_VALUE", dateTimeRenderOption="SERIAL_NUMBER",
+    ))
+    valores = [(faixa.get("values") or [[]])[0] for faixa in resposta.get("valueRanges", [])]
+    # A API corta cada coluna na última célula preenchida
+    total = max((len(v) for v in valores), default=0)
+    dados = {c: v + [None] * (total - len(v)) for c, v in zip(posicoes, valores)}
+    df = pd.DataFrame(dados).replace("", None)
+    print(f"📥 Aba '{ABA}' lida da planilha ({len(df)} registros)")
+    return df
+
+
+def carregar(ano=None, colunas=COLUNAS):
+    """Dados pivotados tipados, só com as colunas usadas e só do ano pedido (padrão: ano corrente)"""
+    ano = datetime.today().year if ano is None else ano
+    colunas = list(colunas)
+
+    df = do_snapshot(colunas, ano)
+    if df is None:
+        df = da_planilha(colunas)
+
+    df = esquema.aplicar(df)
+    if ano and COL_DATA_FILTRO in df.columns:
+        df = df[df[COL_DATA_FILTRO].dt.year == ano]
+    return df.reset_index(drop=True)
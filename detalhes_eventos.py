@@ -0,0 +1,149 @@
+import os
+import time
+import random
+import asyncio
+import aiohttp
+import instrumentacao
+from conta_azul import DETALHE_URL, HEADERS
+
+# ===================== Configurações =====================
+# Concorrência adaptativa (AIMD): sobe aos poucos enquanto tudo vai bem, cai pela metade em 429/5xx/timeout
+DETALHE_CONCORRENCIA_INICIAL = int(os.getenv("DETALHE_CONCORRENCIA_INICIAL", "10"))
+DETALHE_CONCORRENCIA_MIN = int(os.getenv("DETALHE_CONCORRENCIA_MIN", "2"))
+DETALHE_CONCORRENCIA_MAX = int(os.getenv("DETALHE_CONCORRENCIA_MAX", "64"))
+DETALHE_TENTATIVAS = int(os.getenv("DETALHE_TENTATIVAS", "5"))
+DETALHE_TIMEOUT = float(os.getenv("DETALHE_TIMEOUT", "10"))
+
+# Peso de cada resposta na média móvel da latência (só define o intervalo entre reduções)
+ALFA_LATENCIA = 0.2
+ESPERA_MAXIMA = 30.0
+
+# Erros temporários que valem nova tentativa
+STATUS_RETENTATIVA = {429, 500, 502, 503, 504}
+# 4xx que não são do evento em si (token, tempo esgotado, cota): a falha é temporária, não definitiva
+STATUS_4XX_TEMPORARIOS = {401, 408, 429}
+
+
+class Concorrencia:
+    """Semáforo com limite variável: aumento aditivo nos sucessos, redução multiplicativa nos erros
+
+    Só 429, 5xx, timeouts e falhas de conexão reduzem o limite. A latência não entra no
+    controle: a oscilação normal das respostas seria lida como sobrecarga.
+    """
+
+    def __init__(self, inicial=DETALHE_CONCORRENCIA_INICIAL, minimo=DETALHE_CONCORRENCIA_MIN, maximo=DETALHE_CONCORRENCIA_MAX):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.limite = float(max(minimo, min(inicial, maximo)))
+        self.em_uso = 0
+        self.pico = int(self.limite)
+        self.latencia_media = None
+        self._ultima_reducao = 0.0
+        self._condicao = asyncio.Condition()
+
+    async def entrar(self):
+        async with self._condicao:
+            await self._condicao.wait_for(lambda: self.em_uso < int(self.limite))
+            self.em_uso += 1
+
+    async def sair(self):
+        async with self._condicao:
+            self.em_uso -= 1
+            # Acorda só quem cabe no limite atual (que pode ter subido)
+            self._condicao.notify(max(1, int(self.limite) - self.em_uso))
+
+    def sucesso(self, latencia):
+        """Resposta OK: cresce ~1 por janela e atualiza a média móvel da latência"""
+        if self.latencia_media is None:
+            self.latencia_media = latencia
+        else:
+            self.latencia_media += ALFA_LATENCIA * (latencia - self.latencia_media)
+        self.limite = min(self.maximo, self.limite + 1 / self.limite)
+        self.pico = max(self.pico, int(self.limite))
+
+    def reduzir(self, fator=0.5):
+        """Erro: reduz no máximo uma vez por intervalo de latência (as falhas da mesma rajada contam uma vez só)"""
+        agora = time.monotonic()
+        if agora - self._ultima_reducao < (self.latencia_media or 0.1):
+            return
+        self._ultima_reducao = agora
+        self.limite = max(self.minimo, self.limite * fator)
+
+
+def espera_retentativa(tentativa, retry_after=None):
+    """Backoff exponencial com jitter completo; respeita o Retry-After quando vier"""
+    if retry_after:
+        try:
+            return min(ESPERA_MAXIMA, float(retry_after)) + random.uniform(0, 0.5)
+        except ValueError:
+            pass
+    return random.uniform(0, min(ESPERA_MAXIMA, 0.5 * 2 ** tentativa))
+
+
+def falha_permanente(motivo):
+    """Falha definitiva do evento (404, 403, 410...): repetir não adianta, o id pode ter sido apagado"""
+    partes = (motivo or "").split()
+    if len(partes) != 2 or partes[0] != "HTTP" or not partes[1].isdigit():
+        return False
+    status = int(partes[1])
+    return 400 <= status < 500 and status not in STATUS_4XX_TEMPORARIOS
+
+
+async def _buscar_um(sessao, controle, fid, url, tentativas):
+    """Busca o resumo de um evento; devolve (payload, None) ou (None, motivo da falha)"""
+    motivo = None
+    for tentativa in range(tentativas):
+        retry_after = None
+        await controle.entrar()
+        inicio = time.perf_counter()
+        try:
+            async with sessao.get(url.format(fid=fid)) as response:
+                if response.status == 200:
+                    payload = await response.json(content_type=None)
+                    controle.sucesso(time.perf_counter() - inicio)
+                    return payload, None
+                motivo = f"HTTP {response.status}"
+                if response.status not in STATUS_RETENTATIVA:
+                    return None, motivo
+                retry_after = response.headers.get("Retry-After")
+                controle.reduzir()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            motivo = f"{type(e).__name__}: {e}"
+            controle.reduzir()
+        finally:
+            await controle.sair()
+        await asyncio.sleep(espera_retentativa(tentativa, retry_after))
+    return None, motivo
+
+
+async def _buscar_todos(ids, url, tentativas, timeout, concorrencia):
+    controle = Concorrencia(**(concorrencia or {}))
+    conector = aiohttp.TCPConnector(limit=controle.maximo, ttl_dns_cache=300)
+    tempo_limite = aiohttp.ClientTimeout(total=timeout)
+    rastreio = aiohttp.TraceConfig()
+    rastreio.on_request_end.append(instrumentacao.fim_aiohttp)
+    async with aiohttp.ClientSession(
+        headers=HEADERS, connector=conector, timeout=tempo_limite, trace_configs=[rastreio]
+    ) as sessao:
+        resultados = await asyncio.gather(*(_buscar_um(sessao, controle, fid, url, tentativas) for fid in ids))
+
+    detalhes, falhas = {}, {}
+    for fid, (payload, motivo) in zip(ids, resultados):
+        if payload is not None:
+            detalhes[fid] = payload
+        else:
+            falhas[fid] = motivo
+    print(f"  ⚙️ Concorrência final {controle.limite:.1f} (pico {controle.pico}), latência média {controle.latencia_media or 0:.2f}s")
+    return detalhes, falhas, controle
+
+
+def buscar_detalhes(ids, url=DETALHE_URL, tentativas=DETALHE_TENTATIVAS, timeout=DETALHE_TIMEOUT, concorrencia=None):
+    """Busca o resumo de cada financialEvent.id e devolve ({id: payload}, {id: motivo da falha})"""
+    ids = list(ids)
+    inicio = time.perf_counter()
+    detalhes, falhas, _ = asyncio.run(_buscar_todos(ids, url, tentativas, timeout, concorrencia))
+    print(f"✅ {len(detalhes)} de {len(ids)} detalhes obtidos em {time.perf_counter() - inicio:.1f}s")
+    if falhas:
+        amostra = ", ".join(f"{fid} ({motivo})" for fid, motivo in list(falhas.items())[:10])
+        print(f"❌ {len(falhas)} IDs falharam após {tentativas} tentativas: {amostra}")
+    return detalhes, falhas
@@ -0,0 +1,122 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import google_clients
+
+# ===================== Configurações =====================
+# Tamanho máximo do corpo de cada values.batchUpdate e lotes enviados ao mesmo tempo
+SHEETS_LOTE_BYTES = int(os.getenv("SHEETS_LOTE_BYTES", str(2 * 1024 * 1024)))
+SHEETS_MAX_PARALELO = int(os.getenv("SHEETS_MAX_PARALELO", "4"))
+
+_RANGE = re.compile(r"^(?P<aba>.+)!(?P<c1>[A-Z]+)(?P<r1>\d+)(?::(?P<c2>[A-Z]+)\d+)?$")
+
+
+def _tamanho_linha(linha):
+    """Estimativa barata do tamanho da linha serializada em JSON"""
+    return sum(len(str(v)) for v in linha) + 4 * len(linha) + 2
+
+
+def _partes(item, limite_bytes):
+    """Divide um range em blocos contíguos de linhas com até limite_bytes cada"""
+    valores = item["values"]
+    m = _RANGE.match(item["range"])
+    if m is None or len(valores) <= 1:
+        yield item, sum(_tamanho_linha(l) for l in valores)
+        return
+
+    aba, c1, r1, c2 = m.group("aba"), m.group("c1"), int(m.group("r1")), m.group("c2") or m.group("c1")
+    inicio, tamanho = 0, 0
+    for i, linha in enumerate(valores):
+        t = _tamanho_linha(linha)
+        if tamanho and tamanho + t > limite_bytes:
+            yield {"range": f"{aba}!{c1}{r1 + inicio}:{c2}{r1 + i - 1}", "values": valores[inicio:i]}, tamanho
+            inicio, tamanho = i, 0
+        tamanho += t
+    yield {"range": f"{aba}!{c1}{r1 + inicio}:{c2}{r1 + len(valores) - 1}", "values": valores[inicio:]}, tamanho
+
+
+def agrupar(dados, limite_bytes=SHEETS_LOTE_BYTES):
+    """Agrupa os ranges em lotes de values.batchUpdate dimensionados pelo tamanho em bytes"""
+    lote, tamanho_lote = [], 0
+    for item in dados:
+        for parte, tamanho in _partes(item, limite_bytes):
+            tamanho += len(parte["range"]) + 32
+            if lote and tamanho_lote + tamanho > limite_bytes:
+                yield lote
+                lote, tamanho_lote = [], 0
+            lote.append(parte)
+            tamanho_lote += tamanho
+    if lote:
+        yield lote
+
+
+def garantir_grade(spreadsheet_id, aba, linhas, colunas, formato=None):
+    """Aumenta a grade da aba antes do envio, se ela for menor que o necessário
+
+    Com `formato`, as células acrescentadas recebem a mesma formatação no mesmo batchUpdate
+    (sem ela, valores USER_ENTERED nas linhas novas seriam interpretados como datas/números).
+    """
+    sheets = google_clients.sheets_service().spreadsheets()
+    props = google_clients.propriedades_aba(spreadsheet_id, aba)
+    grade = props.get("gridProperties", {})
+    linhas_antes, colunas_antes = grade.get("rowCount", 0), grade.get("columnCount", 0)
+    novas = {
+        "rowCount": max(linhas, linhas_antes),
+        "columnCount": max(colunas, colunas_antes),
+    }
+    if novas["rowCount"] == linhas_antes and novas["columnCount"] == colunas_antes:
+        return
+
+    requests = [{
+        "updateSheetProperties": {
+            "properties": {"sheetId": props["sheetId"], "gridProperties": novas},
+            "fields": "gridProperties(rowCount,columnCount)",
+        }
+    }]
+    if formato:
+        # Linhas novas (em toda a largura) e colunas novas das linhas que já existiam
+        acrescimos = [
+            (linhas_antes, novas["rowCount"], 0, novas["columnCount"]),
+            (0, linhas_antes, colunas_antes, novas["columnCount"]),
+        ]
+        for linha0, linha1, coluna0, coluna1 in acrescimos:
+            if linha1 > linha0 and coluna1 > coluna0:
+                requests.append({"repeatCell": {
+                    "range": {"sheetId": props["sheetId"], "startRowIndex": linha0, "endRowIndex": linha1,
+                              "startColumnIndex": coluna0, "endColumnIndex": coluna1},
+                    "cell": {"userEnteredFormat": formato},
+                    "fields": "userEnteredFormat(" + ",".join(formato) + ")",
+                }})
+
+    google_clients.executar(sheets.batchUpdate(spreadsheetId=spreadsheet_id, body={"requests": requests}))
+    google_clients.invalidar_abas(spreadsheet_id)
+    print(f"  📐 Grade de '{aba}' ajustada para {novas['rowCount']} linhas x {novas['columnCount']} colunas")
+
+
+def enviar(spreadsheet_id, dados, value_input_option="RAW", max_paralelo=SHEETS_MAX_PARALELO):
+    """Envia os ranges em lotes paralelos (a cota de escrita do Sheets é aplicada em google_clients.executar)"""
+    lotes = list(agrupar(dados))
+    if not lotes:
+        return
+
+    valores = google_clients.sheets_service().spreadsheets().values()
+
+    def enviar_lote(lote):
+        google_clients.executar(valores.batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"valueInputOption": value_input_option, "data": lote}
+        ))
+        return sum(len(parte["values"]) for parte in lote)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_paralelo, len(lotes)))) as executor:
+        linhas = sum(executor.map(enviar_lote, lotes))
+    print(f"  📦 {len(lotes)} lote(s) enviados ({linhas} linhas)")
+
+
+def limpar(spreadsheet_id, ranges):
+    """Limpa os ranges num único values.batchClear"""
+    if not ranges:
+        return
+    google_clients.executar(google_clients.sheets_service().spreadsheets().values().batchClear(
+        spreadsheetId=spreadsheet_id, body={"ranges": ranges}
+    ))
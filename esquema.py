@@ -0,0 +1,81 @@
+import re
+import pandas as pd
+import conversao
+
+# ===================== Esquema das colunas do pipeline =====================
+# Tipo de cada coluna conhecida, aplicado na fronteira de cada etapa (leitura e snapshot)
+CATEGORIAS = [
+    "status",
+    "tipo",
+    "Situação",
+    "categoriesRatio.category",
+    "Centro_de_Custo_Unificado",
+]
+DINHEIRO = [
+    "paid",
+    "paid_new",
+    "categoriesRatio.value",
+]
+DATAS = [
+    "dueDate",
+    "financialEvent.competenceDate",
+    "lastAcquittanceDate",
+    "Data movimento",
+]
+
+# Colunas numeradas (um par por centro de custo)
+PADROES = [
+    (re.compile(r"^Centro de Custo \d+$"), "categoria"),
+    (re.compile(r"^Valor no Centro de Custo \d+$"), "dinheiro"),
+]
+
+TODOS = ("categoria", "dinheiro", "data")
+
+
+def tipo_da_coluna(col):
+    """Tipo declarado para a coluna ('categoria', 'dinheiro', 'data') ou None"""
+    if col in CATEGORIAS:
+        return "categoria"
+    if col in DINHEIRO:
+        return "dinheiro"
+    if col in DATAS:
+        return "data"
+    for padrao, tipo in PADROES:
+        if padrao.match(str(col)):
+            return tipo
+    return None
+
+
+def para_dinheiro(col):
+    """Valores monetários para número (float64); textos no formato brasileiro (R$ 1.234,56) são convertidos"""
+    return conversao.dinheiro(col)
+
+
+def para_data(col):
+    """Datas dd/mm/AAAA, AAAA-MM-DD (com ou sem hora) ou seriais do Sheets para datetime64"""
+    return conversao.datas(col)
+
+
+def para_categoria(col):
+    """Texto de baixa cardinalidade como category (nulos continuam nulos)"""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col
+    return col.astype(object).where(col.isna(), col.astype(str)).astype("category")
+
+
+CONVERSORES = {"categoria": para_categoria, "dinheiro": para_dinheiro, "data": para_data}
+
+
+def aplicar(df, tipos=TODOS):
+    """Devolve o DataFrame com as colunas conhecidas convertidas para os tipos declarados"""
+    convertidas = {}
+    for col in df.columns:
+        tipo = tipo_da_coluna(col)
+        if tipo in tipos:
+            convertidas[col] = CONVERSORES[tipo](df[col])
+    if not convertidas:
+        return df
+    df = df.copy(deep=False)
+    for col, serie in convertidas.items():
+        df[col] = serie
+    return df
@@ -0,0 +1,214 @@
+import sys
+import pandas as pd
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import banco
+import conversao
+import esquema
+import google_clients
+import instrumentacao
+import publicacao
+import snapshots
+import sync_incremental
+from conta_azul import STATUS_LIST, MAX_WORKERS, baixar_exports, criar_sessao
+
+# ===================== Configurações =====================
+folder_id = "1kdk_mWvqFbQjW6Kit_NoyYe0zBqtDOxa"
+
+# Tipo de lançamento na Conta Azul e planilha de destino de cada extração
+TIPOS = {
+    "pagar": {"tipo": "EXPENSE", "sheet_name": "Financeiro_contas_a_pagar_King", "snapshot": "contas_a_pagar"},
+    "receber": {"tipo": "REVENUE", "sheet_name": "FInanceiro_contas_a_receber_King", "snapshot": "contas_a_receber"},
+}
+
+colunas_renomear = {
+    "Data original de vencimento": "dueDate",
+    "Data de competência": "financialEvent.competenceDate",
+    "Valor (R$)": "paid",
+    "Categoria 1": "categoriesRatio.category",
+    "Descrição": "description",
+    "Nome do fornecedor/cliente": "financialEvent.negotiator.name",
+    "Data do último pagamento": "lastAcquittanceDate"
+}
+
+
+def consolidar(all_dataframes, rotulo):
+    """Consolida os exports de todos os status e aplica as regras de negócio"""
+    if not all_dataframes:
+        raise Exception(f"❌ [{rotulo}] Nenhum dado foi baixado com sucesso!")
+
+    print(f"\n🔄 [{rotulo}] Consolidando {len(all_dataframes)} arquivos...")
+    # Exports vazios ou com colunas de datas vazias fazem o concat cair para object; infer_objects devolve os tipos
+    df_consolidado = pd.concat(all_dataframes, ignore_index=True).infer_objects()
+
+    if 'id' in df_consolidado.columns:
+        df_consolidado = df_consolidado.drop_duplicates(subset=['id'], keep='first')
+        df_consolidado['id'] = df_consolidado['id'].astype(str)
+        print(f"📋 [{rotulo}] Total de registros únicos após remoção de duplicatas: {len(df_consolidado)}")
+    else:
+        print(f"📋 [{rotulo}] Total de registros consolidados: {len(df_consolidado)}")
+
+    # ===================== MAPEAR CONCILIATED PARA ACQUITTED =====================
+    mask_conciliated = df_consolidado['status'] == 'CONCILIATED'
+    total_conciliated = mask_conciliated.sum()
+    df_consolidado.loc[mask_conciliated, 'status'] = 'ACQUITTED'
+    print(f"  ✅ [{rotulo}] {total_conciliated} registros CONCILIATED convertidos para ACQUITTED")
+
+    # ===================== Criar coluna "Data do último pagamento" =====================
+    if 'Situação' in df_consolidado.columns and 'Data movimento' in df_consolidado.columns:
+        df_consolidado['Data do último pagamento'] = None
+
+        mask = df_consolidado['Situação'].isin(['Quitado', 'Conciliado'])
+        df_consolidado.loc[mask, 'Data do último pagamento'] = df_consolidado.loc[mask, 'Data movimento']
+
+        registros_preenchidos = mask.sum()
+        print(f"  ✅ [{rotulo}] Coluna 'Data do último pagamento' criada com {registros_preenchidos} registros preenchidos")
+    else:
+        print(f"  ⚠️ [{rotulo}] AVISO: Colunas 'Situação' e/ou 'Data movimento' não encontradas!")
+
+    # ===================== Atualizar status PENDING para OVERDUE =====================
+    ontem = datetime.now() - timedelta(days=1)
+    ontem = ontem.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    col_vencimento = "Data do último pagamento"
+
+    if col_vencimento in df_consolidado.columns:
+        df_consolidado[col_vencimento] = conversao.datas(df_consolidado[col_vencimento])
+        mask_update = (df_consolidado['status'] == 'PENDING') & (df_consolidado[col_vencimento] <= ontem)
+        total_atualizados = mask_update.sum()
+        df_consolidado.loc[mask_update, 'status'] = 'OVERDUE'
+        print(f"  ✅ [{rotulo}] {total_atualizados} registros PENDING atualizados para OVERDUE")
+    else:
+        print(f"  ⚠️ [{rotulo}] AVISO: Coluna '{col_vencimento}' não encontrada!")
+
+    # ===================== Converter colunas datetime para string =====================
+    datetime_columns = df_consolidado.select_dtypes(include=['datetime64']).columns.tolist()
+
+    for col in datetime_columns:
+        df_consolidado[col] = df_consolidado[col].dt.strftime('%d/%m/%Y')
+
+    # ===================== Renomear colunas conforme especificação =====================
+    colunas_renomeadas = {}
+    for col_antiga, col_nova in colunas_renomear.items():
+        if col_antiga in df_consolidado.columns:
+            colunas_renomeadas[col_antiga] = col_nova
+        else:
+            print(f"  ⚠️ [{rotulo}] Coluna '{col_antiga}' não encontrada")
+
+    df_consolidado.rename(columns=colunas_renomeadas, inplace=True)
+
+    return df_consolidado
+
+
+def para_planilha(df_consolidado):
+    """Converte todos os valores para string para evitar a auto-formatação do Google Sheets"""
+    return df_consolidado.astype(str)
+
+
+def buscar_planilha(sheet_name):
+    """Busca o ID da planilha pelo nome na pasta do Drive (em cache por processo)"""
+    return google_clients.id_arquivo(sheet_name, folder_id, google_clients.MIME_PLANILHA)
+
+
+def publicar(df_consolidado, sheet_name, nome):
+    """Publica os dados consolidados enviando só as células que mudaram desde a última publicação"""
+    spreadsheet_id = buscar_planilha(sheet_name)
+    print(f"📤 Atualizando planilha '{sheet_name}' com {len(df_consolidado)} registros...")
+    publicacao.publicar(spreadsheet_id, para_planilha(df_consolidado), nome, chaves=("id",))
+
+
+def sincronizar(chave, sessao=None):
+    """Baixa e consolida um tipo, completo ou incremental, e calcula o delta contra o estado local"""
+    config = TIPOS[chave]
+    estado = sync_incremental.carregar(chave)
+    completa = sync_incremental.precisa_sync_completa(estado)
+
+    if not completa:
+        janelas = sync_incremental.janelas_incrementais(STATUS_LIST, estado)
+        print(f"📥 [{chave}] Sincronização incremental de {config['tipo']} (liquidados desde {next(iter(janelas.values()), '-')})...")
+        all_dataframes = baixar_exports(config["tipo"], sessao=sessao, janelas=janelas)
+        with instrumentacao.etapa("consolidar"):
+            parcial = consolidar(all_dataframes, chave)
+
+        if 'id' in parcial.columns and parcial.columns.tolist() == estado["colunas"]:
+            origem = sync_incremental.status_de_origem(all_dataframes)
+            # Sumiços só são confirmados na sincronização completa (todos os status sem janela)
+            df, delta, hashes, origem = sync_incremental.mesclar(estado, parcial, origem)
+            return df, delta, hashes, origem, completa
+
+        print(f"  ⚠️ [{chave}] Colunas do export mudaram, reconciliando o histórico completo")
+        completa = True
+
+    print(f"📥 [{chave}] Sincronização completa de {config['tipo']} ({len(STATUS_LIST)} status)...")
+    all_dataframes = baixar_exports(config["tipo"], sessao=sessao)
+    with instrumentacao.etapa("consolidar"):
+        df = consolidar(all_dataframes, chave)
+    if 'id' not in df.columns:
+        return df, None, None, None, completa
+
+    origem = sync_incremental.status_de_origem(all_dataframes)
+    # Com status faltando, os registros guardados não podem ser dados como removidos
+    if len(all_dataframes) < len(STATUS_LIST) and estado is not None and df.columns.tolist() == estado["colunas"]:
+        df, delta, hashes, origem = sync_incremental.mesclar(estado, df, origem)
+        return df, delta, hashes, origem, False
+
+    delta, hashes, origem = sync_incremental.comparar(estado, df, origem)
+    return df, delta, hashes, origem, completa
+
+
+def processar(chave, sessao=None):
+    """Extrai, consolida e publica um tipo de lançamento ('pagar' ou 'receber')"""
+    sheet_name = TIPOS[chave]["sheet_name"]
+
+    with instrumentacao.etapa(f"{chave}/sincronizar"):
+        df_consolidado, delta, hashes, origem, completa = sincronizar(chave, sessao)
+    # Datas continuam em texto dd/mm/AAAA para a planilha e o estado; no snapshot vão tipadas
+    df_consolidado = esquema.aplicar(df_consolidado, ("categoria", "dinheiro"))
+
+    if delta is None:
+        print(f"  ⚠️ [{chave}] Export sem coluna 'id': sincronização incremental indisponível")
+    else:
+        print(f"🔎 [{chave}] Delta: {len(delta.novos)} novos, {len(delta.alterados)} alterados, {len(delta.removidos)} removidos")
+
+    if delta is not None and not completa and not (delta.novos or delta.alterados or delta.removidos):
+        print(f"✅ [{chave}] Nenhuma alteração desde a última execução; planilha '{sheet_name}' mantida")
+    else:
+        with instrumentacao.etapa(f"{chave}/publicar"):
+            publicar(df_consolidado, sheet_name, TIPOS[chave]["snapshot"])
+        print(f"\n✅ Planilha Google '{sheet_name}' atualizada com sucesso!")
+
+    with instrumentacao.etapa(f"{chave}/estado"):
+        if delta is not None:
+            sync_incremental.salvar(chave, df_consolidado, delta, hashes, origem, completa)
+        df_tipado = esquema.aplicar(df_consolidado)
+        snapshots.salvar(df_tipado, TIPOS[chave]["snapshot"])
+
+    # Cópia no banco (DB_URL): carga em massa com upsert pelo id
+    if banco.habilitado():
+        with instrumentacao.etapa(f"{chave}/banco"):
+            banco.publicar(df_tipado, TIPOS[chave]["snapshot"])
+
+    print(f"📊 [{chave}] Total de registros: {len(df_consolidado)}")
+    print(f"📊 [{chave}] Registros por status (após ajustes):")
+    for status, count in df_consolidado['status'].value_counts().items():
+        print(f"  - {status}: {count} registros")
+
+    return df_consolidado
+
+
+def executar(chaves=tuple(TIPOS)):
+    """Processa os tipos em paralelo no mesmo processo, compartilhando sessão HTTP e clientes Google"""
+    # Autentica e constrói os clientes antes de abrir as threads
+    google_clients.aquecer()
+
+    sessao = criar_sessao(MAX_WORKERS * len(chaves))
+    try:
+        with ThreadPoolExecutor(max_workers=len(chaves)) as executor:
+            futures = {chave: executor.submit(processar, chave, sessao) for chave in chaves}
+            return {chave: future.result() for chave, future in futures.items()}
+    finally:
+        sessao.close()
+
+
+if __name__ == "__main__":
+    executar(sys.argv[1:] or tuple(TIPOS))
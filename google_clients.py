@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import threading
+from functools import lru_cache
+import httplib2
+import google_auth_httplib2
+from google.auth.credentials import AnonymousCredentials
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+import cota_google
+import instrumentacao
+
+# ===================== Autenticar com Google APIs =====================
+SCOPES = ["https://www.googleapis.com/auth/drive", "https://www.googleapis.com/auth/spreadsheets"]
+
+# Erros temporários que valem nova tentativa com backoff exponencial
+STATUS_RETENTATIVA = {429, 500, 502, 503, 504}
+# Motivos do 403 que indicam cota estourada (e não falta de permissão)
+MOTIVOS_COTA = (b"rateLimitExceeded", b"userRateLimitExceeded")
+GOOGLE_TENTATIVAS = int(os.getenv("GOOGLE_TENTATIVAS", "6"))
+GOOGLE_TIMEOUT = float(os.getenv("GOOGLE_TIMEOUT", "120"))
+
+# Servidor local que imita Sheets/Drive (benchmark): sem autenticação, mesmo formato de URL
+GOOGLE_API_EMULADOR = os.getenv("GOOGLE_API_EMULADOR", "").rstrip("/")
+
+MIME_PLANILHA = "application/vnd.google-apps.spreadsheet"
+
+_lock = threading.Lock()
+_local = threading.local()
+_metadados = {}
+
+
+@lru_cache(maxsize=None)
+def credenciais():
+    """Carrega as credenciais da service account uma única vez por processo"""
+    if GOOGLE_API_EMULADOR:
+        return AnonymousCredentials()
+    json_secret = os.getenv("GDRIVE_SERVICE_ACCOUNT")
+    credentials_info = json.loads(json_secret)
+    return service_account.Credentials.from_service_account_info(credentials_info, scopes=SCOPES)
+
+
+def drive_service():
+    """Cliente do Drive v3 compartilhado pelo processo"""
+    with _lock:
+        return _drive_service()
+
+
+def sheets_service():
+    """Cliente do Sheets v4 compartilhado pelo processo"""
+    with _lock:
+        return _sheets_service()
+
+
+def _build(api, versao, endpoint):
+    """Monta o cliente a partir do discovery embutido na biblioteca (sem baixar o documento)"""
+    opcoes = {"api_endpoint": GOOGLE_API_EMULADOR + endpoint} if GOOGLE_API_EMULADOR else None
+    return build(
+        api, versao, credentials=credenciais(), static_discovery=True, cache_discovery=False, client_options=opcoes
+    )
+
+
+@lru_cache(maxsize=None)
+def _drive_service():
+    return _build("drive", "v3", "/drive/v3/")
+
+
+@lru_cache(maxsize=None)
+def _sheets_service():
+    return _build("sheets", "v4", "/")
+
+
+def aquecer():
+    """Autentica e monta os clientes antes de abrir threads"""
+    credenciais()
+    drive_service()
+    sheets_service()
+
+
+def http_autorizado():
+    """Http autorizado exclusivo da thread atual (httplib2 não é thread-safe)
+
+    O mesmo Http é reaproveitado por todas as chamadas da thread, mantendo as conexões abertas.
+    """
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = google_auth_httplib2.AuthorizedHttp(credenciais(), http=httplib2.Http(timeout=GOOGLE_TIMEOUT))
+        http.request = instrumentacao.contar_httplib2(http.request)
+        _local.http = http
+    return http
+
+
+def cota_da_requisicao(request):
+    """Cota que a requisição consome: Drive, leitura (GET) ou escrita do Sheets"""
+    if "/drive/" in request.uri:
+        return cota_google.drive
+    return cota_google.leitura_sheets if request.method == "GET" else cota_google.escrita_sheets
+
+
+def _limite_de_cota(e):
+    """429 ou 403 por cota estourada (rateLimitExceeded/userRateLimitExceeded)"""
+    return e.resp.status == 429 or (e.resp.status == 403 and any(m in (e.content or b"") for m in MOTIVOS_COTA))
+
+
+def executar(request, tentativas=GOOGLE_TENTATIVAS):
+    """Executa uma requisição da API do Google com o Http da thread atual
+
+    Cada tentativa consome da cota compartilhada do processo. Erros temporários (429/5xx, 403 de cota
+    e falhas de conexão) são repetidos com backoff exponencial e jitter, respeitando o Retry-After;
+    quando a cota estoura, a espera vale para todas as threads que usam a mesma cota.
+    """
+    cota = cota_da_requisicao(request)
+    for tentativa in range(tentativas):
+        cota.consumir()
+        try:
+            return request.execute(http=http_autorizado())
+        except HttpError as e:
+            if not (e.resp.status in STATUS_RETENTATIVA or _limite_de_cota(e)) or tentativa == tentativas - 1:
+                raise
+            espera = cota_google.espera_retentativa(tentativa, e.resp.get("retry-after"))
+            if _limite_de_cota(e):
+                cota.pausar(espera)
+            print(f"  ⏳ Google API respondeu {e.resp.status}; nova tentativa em {espera:.1f}s")
+        except (ConnectionError, TimeoutError) as e:
+            if tentativa == tentativas - 1:
+                raise
+            espera = cota_google.espera_retentativa(tentativa)
+            print(f"  ⏳ Falha de conexão com a Google API ({type(e).__name__}); nova tentativa em {espera:.1f}s")
+        time.sleep(espera)
+
+
+# ===================== Metadados em cache =====================
+@lru_cache(maxsize=None)
+def id_arquivo(nome, pasta, mime_type=None):
+    """ID de um arquivo pelo nome dentro da pasta do Drive (consultado uma vez por processo)"""
+    query = f"name='{nome}' and '{pasta}' in parents and trashed=false"
+    if mime_type:
+        query += f" and mimeType='{mime_type}'"
+    resultado = executar(drive_service().files().list(q=query, spaces="drive", fields="files(id, name)"))
+    arquivos = resultado.get("files", [])
+    if not arquivos:
+        raise FileNotFoundError(f"Arquivo '{nome}' não encontrado na pasta do Drive.")
+    return arquivos[0]["id"]
+
+
+def abas(spreadsheet_id, atualizar=False):
+    """Propriedades das abas da planilha (sheetId, título, índice e grade), em cache por processo"""
+    with _lock:
+        if not atualizar and spreadsheet_id in _metadados:
+            return _metadados[spreadsheet_id]
+    info = executar(sheets_service().spreadsheets().get(
+        spreadsheetId=spreadsheet_id, fields="sheets.properties(sheetId,title,index,gridProperties)"
+    ))
+    propriedades = [s["properties"] for s in info.get("sheets", [])]
+    with _lock:
+        _metadados[spreadsheet_id] = propriedades
+    return propriedades
+
+
+def invalidar_abas(spreadsheet_id):
+    """Descarta os metadados guardados depois de mudar a estrutura da planilha"""
+    with _lock:
+        _metadados.pop(spreadsheet_id, None)
+
+
+def propriedades_aba(spreadsheet_id, titulo=None, indice=0):
+    """Propriedades de uma aba pelo título ou, sem título, pela posição; None se não existir"""
+    for props in abas(spreadsheet_id):
+        if (props["title"] == titulo) if titulo is not None else (props.get("index", 0) == indice):
+            return props
+    return None
+
+
+def garantir_aba(spreadsheet_id, titulo, linhas=1000, colunas=26):
+    """Cria a aba se ela ainda não existir e devolve suas propriedades"""
+    props = propriedades_aba(spreadsheet_id, titulo)
+    if props is not None:
+        return props
+    executar(sheets_service().spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={"requests": [{
+        "addSheet": {"properties": {"title": titulo, "gridProperties": {"rowCount": linhas, "columnCount": colunas}}}
+    }]}))
+    invalidar_abas(spreadsheet_id)
+    print(f"  ➕ Aba '{titulo}' criada")
+    return propriedades_aba(spreadsheet_id, titulo)
+
+
+def ler_valores(spreadsheet_id, intervalo, renderizacao="FORMATTED_VALUE"):
+    """Valores de um range A1 como lista de linhas"""
+    resultado = executar(sheets_service().spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=intervalo, valueRenderOption=renderizacao
+    ))
+    return resultado.get("values", [])
@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import resource
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from snapshots import SNAPSHOT_DIR
+
+# ===================== Configurações =====================
+# Relatório JSON de cada execução (tempos, memória e chamadas HTTP por etapa), junto dos snapshots
+INSTRUMENTACAO = os.getenv("INSTRUMENTACAO", "1") != "0"
+INSTRUMENTACAO_DIR = os.getenv("INSTRUMENTACAO_DIR", os.path.join(SNAPSHOT_DIR, "relatorios"))
+INSTRUMENTACAO_AMOSTRAGEM = float(os.getenv("INSTRUMENTACAO_AMOSTRAGEM", "0.05"))
+# Relatórios (e perfis) mais antigos que os N últimos são apagados
+INSTRUMENTACAO_MANTER = int(os.getenv("INSTRUMENTACAO_MANTER", "100"))
+
+# Profiler opcional por etapa: "cprofile" ou "pyinstrument"; INSTRUMENTACAO_PERFIL_ETAPAS limita a
+# algumas etapas (nomes separados por vírgula). O profiler só enxerga a thread que abriu a etapa.
+INSTRUMENTACAO_PERFIL = os.getenv("INSTRUMENTACAO_PERFIL", "").lower()
+INSTRUMENTACAO_PERFIL_ETAPAS = {e for e in os.getenv("INSTRUMENTACAO_PERFIL_ETAPAS", "").split(",") if e}
+
+_INICIO = time.perf_counter()
+_INICIO_DATA = datetime.now()
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+_lock = threading.Lock()
+_local = threading.local()
+_etapas = []
+_ativas = {}
+_http = {}
+_amostrador = None
+_perfil_ativo = False
+
+
+# ===================== Memória =====================
+def pico_rss_mb():
+    """Pico de memória residente do processo (ru_maxrss vem em KB no Linux e em bytes no macOS)"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def rss_mb():
+    """Memória residente atual; fora do Linux, cai para o pico do processo"""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * _PAGINA / (1024 * 1024)
+    except OSError:
+        return pico_rss_mb()
+
+
+def _amostrar():
+    """Thread que mede o RSS periodicamente e atualiza o pico das etapas abertas"""
+    while True:
+        time.sleep(INSTRUMENTACAO_AMOSTRAGEM)
+        atual = rss_mb()
+        with _lock:
+            for registro in _ativas.values():
+                registro["pico_rss_mb"] = max(registro["pico_rss_mb"], atual)
+
+
+def _iniciar_amostrador():
+    global _amostrador
+    with _lock:
+        if _amostrador is None:
+            _amostrador = threading.Thread(target=_amostrar, name="instrumentacao", daemon=True)
+            _amostrador.start()
+
+
+# ===================== HTTP =====================
+def host_da_url(url):
+    """host[:porta] de uma URL, a chave dos contadores HTTP"""
+    return urlsplit(str(url)).netloc or "?"
+
+
+def registrar_http(host, enviados=0, recebidos=0, status=None):
+    """Conta uma requisição HTTP (bytes enviados e recebidos) para o host"""
+    if not INSTRUMENTACAO:
+        return
+    with _lock:
+        atual = _http.setdefault(host or "?", {"requisicoes": 0, "enviados": 0, "recebidos": 0, "erros": 0})
+        atual["requisicoes"] += 1
+        atual["enviados"] += enviados or 0
+        atual["recebidos"] += recebidos or 0
+        if status is not None and status >= 400:
+            atual["erros"] += 1
+
+
+def contar_httplib2(request):
+    """Envolve o request() de um Http (httplib2/AuthorizedHttp) para contar as chamadas"""
+    def request_contado(uri, method="GET", body=None, *args, **kwargs):
+        resposta, conteudo = request(uri, method, body, *args, **kwargs)
+        registrar_http(host_da_url(uri), len(body or b""), len(conteudo or b""), resposta.status)
+        return resposta, conteudo
+    return request_contado
+
+
+def hook_requests(resposta, *args, **kwargs):
+    """Hook de resposta de requests.Session (o corpo em streaming é medido pelo Content-Length)"""
+    corpo = resposta.request.body
+    registrar_http(
+        host_da_url(resposta.url),
+        len(corpo) if isinstance(corpo, (bytes, str)) else 0,
+        int(resposta.headers.get("Content-Length") or 0),
+        resposta.status_code,
+    )
+
+
+async def fim_aiohttp(sessao, contexto, params):
+    """on_request_end de um aiohttp.TraceConfig"""
+    registrar_http(host_da_url(params.url), 0, params.response.content_length or 0, params.response.status)
+
+
+def _copia_http():
+    with _lock:
+        return {host: dict(v) for host, v in _http.items()}
+
+
+def _diferenca_http(antes, depois):
+    diferenca = {}
+    for host, atual in depois.items():
+        anterior = antes.get(host, {})
+        delta = {k: v - anterior.get(k, 0) for k, v in atual.items()}
+        if delta["requisicoes"]:
+            diferenca[host] = delta
+    return diferenca
+
+
+# ===================== Profiler =====================
+def _iniciar_perfil(nome):
+    """Liga o profiler configurado para a etapa, se houver; só um por vez no processo"""
+    global _perfil_ativo
+    if not INSTRUMENTACAO_PERFIL or (INSTRUMENTACAO_PERFIL_ETAPAS and nome not in INSTRUMENTACAO_PERFIL_ETAPAS):
+        return None
+    with _lock:
+        if _perfil_ativo:
+            return None
+        _perfil_ativo = True
+    if INSTRUMENTACAO_PERFIL == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("  ⚠️ pyinstrument não instalado; usando cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _salvar_perfil(profiler, nome):
+    global _perfil_ativo
+    os.makedirs(INSTRUMENTACAO_DIR, exist_ok=True)
+    base = os.path.join(INSTRUMENTACAO_DIR, f"{_processo()}_{_INICIO_DATA:%Y%m%d_%H%M%S}_{nome.replace('/', '_')}")
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        caminho = base + ".prof"
+        profiler.dump_stats(caminho)
+    else:
+        profiler.stop()
+        caminho = base + ".html"
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(profiler.output_html())
+    with _lock:
+        _perfil_ativo = False
+    return caminho
+
+
+# ===================== Etapas =====================
+@contextmanager
+def etapa(nome):
+    """Mede uma etapa: tempo, CPU da thread, memória (início, fim e pico) e chamadas HTTP
+
+    Etapas abertas dentro de outra (na mesma thread) ganham o nome completo 'pai/filha'.
+    As chamadas HTTP contadas incluem as de outras threads que rodaram no mesmo período.
+    """
+    if not INSTRUMENTACAO:
+        yield
+        return
+    _iniciar_amostrador()
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    nome_completo = f"{pilha[-1]['nome']}/{nome}" if pilha else nome
+
+    rss = rss_mb()
+    registro = {
+        "nome": nome_completo,
+        "inicio_s": round(time.perf_counter() - _INICIO, 3),
+        "rss_inicio_mb": round(rss, 1),
+        "pico_rss_mb": rss,
+    }
+    http_antes = _copia_http()
+    inicio, cpu = time.perf_counter(), time.thread_time()
+    profiler = _iniciar_perfil(nome_completo)
+    pilha.append(registro)
+    with _lock:
+        _ativas[id(registro)] = registro
+    try:
+        yield
+    except BaseException as e:
+        registro["erro"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        pilha.pop()
+        if profiler is not None:
+            registro["perfil"] = _salvar_perfil(profiler, nome_completo)
+        rss = rss_mb()
+        with _lock:
+            _ativas.pop(id(registro), None)
+        registro.update(
+            duracao_s=round(time.perf_counter() - inicio, 3),
+            cpu_s=round(time.thread_time() - cpu, 3),
+            rss_fim_mb=round(rss, 1),
+            pico_rss_mb=round(max(registro["pico_rss_mb"], rss), 1),
+            http=_diferenca_http(http_antes, _copia_http()),
+        )
+        with _lock:
+            _etapas.append(registro)
+
+
+# ===================== Relatório =====================
+def _processo():
+    return os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+
+
+def relatorio():
+    """Resumo da execução até agora: etapas na ordem em que terminaram e totais HTTP por host"""
+    with _lock:
+        etapas = list(_etapas)
+    return {
+        "processo": _processo(),
+        "argv": sys.argv,
+        "inicio": _INICIO_DATA.isoformat(timespec="seconds"),
+        "duracao_s": round(time.perf_counter() - _INICIO, 3),
+        "pico_rss_mb": round(pico_rss_mb(), 1),
+        "etapas": etapas,
+        "http": _copia_http(),
+    }
+
+
+def salvar_relatorio(caminho=None):
+    """Grava o relatório JSON da execução e devolve o caminho"""
+    caminho = caminho or os.path.join(INSTRUMENTACAO_DIR, f"{_processo()}_{_INICIO_DATA:%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio(), arquivo, ensure_ascii=False, indent=2)
+    _podar(os.path.dirname(caminho) or ".")
+    return caminho
+
+
+def _podar(diretorio):
+    """Mantém só os INSTRUMENTACAO_MANTER relatórios mais recentes do diretório"""
+    arquivos = [os.path.join(diretorio, a) for a in os.listdir(diretorio) if a.endswith((".json", ".prof", ".html"))]
+    arquivos.sort(key=os.path.getmtime, reverse=True)
+    for antigo in arquivos[INSTRUMENTACAO_MANTER:]:
+        os.remove(antigo)
+
+
+@atexit.register
+def _salvar_no_fim():
+    """Grava o relatório ao sair, se alguma etapa foi medida"""
+    if INSTRUMENTACAO and _etapas:
+        print(f"📈 Relatório de execução salvo em {salvar_relatorio()}")
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# ===================== Configurações =====================
+COL_VALOR = "paid_new"
+COL_CATEGORIA = "categoriesRatio.category"
+ULTIMOS_MESES = 6
+MESES_ALTA = 3
+LIMITE_ALTA = 0.3
+
+
+def agregar(df, hoje):
+    """Uma única passada groupby sobre as transações; todos os indicadores saem daqui
+
+    Agrupa por tipo, status, mês, categoria e pelas flags 'realizada' (pagamento até hoje)
+    e 'vencida' (valor positivo com vencimento até hoje), somando o valor e o valor absoluto.
+    """
+    valor = pd.to_numeric(df[COL_VALOR], errors="coerce")
+    base = pd.DataFrame({
+        "tipo": df["tipo"].astype(object).str.strip().str.capitalize(),
+        "status": df["status"].astype(object),
+        "AnoMes": df["lastAcquittanceDate"].dt.to_period("M"),
+        "categoria": df[COL_CATEGORIA].astype(object),
+        "realizada": (df["lastAcquittanceDate"] <= hoje).to_numpy(),
+        "vencida": ((valor > 0) & (df["dueDate"] <= hoje)).to_numpy(),
+        "valor": valor,
+        "valor_abs": valor.abs(),
+    })
+    return base.groupby(
+        ["tipo", "status", "AnoMes", "categoria", "realizada", "vencida"], dropna=False, sort=False
+    ).agg(
+        valor=("valor", "sum"),
+        valor_abs=("valor_abs", "sum"),
+        registros=("valor", "size"),
+    ).reset_index()
+
+
+def _por_mes_e_tipo(agg):
+    """Soma mensal por tipo (colunas Receita e Despesa, zero quando não houver)"""
+    tabela = agg.groupby(["AnoMes", "tipo"])["valor"].sum().unstack(fill_value=0)
+    return tabela.reindex(columns=["Receita", "Despesa"], fill_value=0)
+
+
+def calcular_resumo(df, hoje=None):
+    """Indicadores financeiros do período a partir das transações pivotadas
+
+    Espera as colunas tipo, status, paid_new, categoriesRatio.category e as datas
+    lastAcquittanceDate/dueDate já convertidas para datetime.
+    """
+    hoje = pd.Timestamp(hoje if hoje is not None else datetime.today().date())
+    agg = agregar(df, hoje)
+
+    receita = (agg["tipo"] == "Receita").to_numpy()
+    despesa = (agg["tipo"] == "Despesa").to_numpy()
+    overdue = (agg["status"] == "OVERDUE").to_numpy()
+    realizada = agg["realizada"].to_numpy(dtype=bool)
+    vencida = agg["vencida"].to_numpy(dtype=bool)
+    valores = agg["valor"].to_numpy()
+
+    # Valores totais
+    total_recebido = valores[receita].sum()
+    total_pago = valores[despesa].sum()
+    total_pendente_receita = valores[receita & overdue].sum()
+    total_pendente_despesa = valores[despesa & overdue].sum()
+    total_vencido = valores[receita & overdue & vencida].sum()
+    inadimplencia = total_vencido / total_recebido if total_recebido > 0 else 0
+
+    # Resumo trimestral
+    trimestral = agg.assign(Trimestre=agg["AnoMes"].dt.asfreq("Q"))
+    trimestral = trimestral.groupby(["Trimestre", "tipo"])["valor"].sum().unstack(fill_value=0)
+    trimestral = trimestral.reindex(columns=["Receita", "Despesa"], fill_value=0)
+
+    # Variação mensal por categoria: altas acima do limite nos últimos meses
+    mensal_categoria = agg.groupby(["AnoMes", "categoria"])["valor"].sum().unstack(fill_value=0)
+    variacao = mensal_categoria.pct_change().fillna(0).tail(MESES_ALTA)
+    categorias_com_alta = {}
+    for mes, linha in zip(variacao.index, variacao.to_numpy()):
+        altas = linha > LIMITE_ALTA
+        if altas.any():
+            categorias_com_alta[str(mes)] = dict(zip(variacao.columns[altas], linha[altas].tolist()))
+
+    # Top 3 categorias por número de lançamentos
+    top_categorias = (
+        agg.groupby("categoria")["registros"].sum()
+        .sort_values(ascending=False, kind="stable").head(3)
+    )
+
+    # Fluxo de caixa: receitas entram positivas e todo o resto sai negativo
+    realizadas = agg[realizada]
+    ajustado = np.where(receita[realizada], realizadas["valor_abs"], -realizadas["valor_abs"])
+    fluxo = pd.Series(ajustado, index=realizadas["AnoMes"].to_numpy()).groupby(level=0).sum()
+    saldo = fluxo.cumsum()
+    fluxo, saldo = fluxo.tail(ULTIMOS_MESES), saldo.tail(ULTIMOS_MESES)
+
+    # Rentabilidade mensal das transações realizadas
+    rentabilidade = _por_mes_e_tipo(realizadas[receita[realizada] | despesa[realizada]]).tail(ULTIMOS_MESES)
+    paid_receita = rentabilidade["Receita"].to_numpy(dtype=float)
+    lucro = paid_receita - rentabilidade["Despesa"].to_numpy(dtype=float)
+    margem = np.divide(lucro, paid_receita, out=np.zeros_like(lucro), where=paid_receita > 0)
+
+    return {
+        "visao_geral": {
+            "total_recebido": float(total_recebido),
+            "total_pago": float(total_pago),
+            "receita_pendente": float(total_pendente_receita),
+            "despesa_pendente": float(total_pendente_despesa),
+            "saldo_liquido": float(total_recebido - total_pago),
+            "inadimplencia_pct": float(inadimplencia),
+        },
+        "top_3_categorias": {k: int(v) for k, v in top_categorias.items()},
+        "resumo_trimestral": {
+            str(t): {"Receita": float(r), "Despesa": float(d)}
+            for t, r, d in zip(trimestral.index, trimestral["Receita"], trimestral["Despesa"])
+        },
+        "categorias_alta_recente": categorias_com_alta,
+        "fluxo_caixa_ultimos_6m": [
+            {"mes": str(m), "valor": float(v), "saldo_acum": float(s)}
+            for m, v, s in zip(fluxo.index, fluxo.to_numpy(), saldo.to_numpy())
+        ],
+        "rentabilidade_ultimos_6m": [
+            {"mes": str(m), "lucro": float(l), "margem_lucro_pct": float(p)}
+            for m, l, p in zip(rentabilidade.index, lucro, margem)
+        ],
+    }
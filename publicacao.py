@@ -0,0 +1,266 @@
+import os
+import random
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+import google_clients
+import envio_planilhas
+import snapshots
+from sync_incremental import ESTADO_DIR
+
+# ===================== Configurações =====================
+# Última versão publicada de cada aba (mesma ordem de linhas da planilha)
+PUBLICADO_DIR = os.path.join(ESTADO_DIR, "publicado")
+
+# Acima desta fração de células alteradas numa linha, a linha inteira é reenviada
+LIMITE_LINHA_INTEIRA = 0.5
+
+# Aba de preparo usada na reescrita completa; sobras de execuções interrompidas são apagadas na troca
+SUFIXO_PREPARO = "__preparo"
+
+# Formatação aplicada uma vez ao range escrito (texto puro, fundo branco, sem negrito/itálico)
+FORMATO_CELULAS = {
+    "numberFormat": {"type": "TEXT"},
+    "backgroundColor": {"red": 1, "green": 1, "blue": 1},
+    "textFormat": {"bold": False, "italic": False, "foregroundColor": {"red": 0, "green": 0, "blue": 0}},
+}
+
+
+def coluna_letra(n):
+    """Converte índice de coluna (1 = A) para letra (A, B, ..., AA, ...)"""
+    letras = ""
+    while n > 0:
+        n, resto = divmod(n - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def ref_aba(aba):
+    """Nome da aba entre aspas para uso em ranges A1"""
+    return "'" + aba.replace("'", "''") + "'"
+
+
+def intervalo(aba, linha, col_inicio, col_fim=None, linha_fim=None):
+    """Monta um range A1 ('Aba'!B2:D2) a partir de índices 1-based"""
+    inicio = f"{coluna_letra(col_inicio)}{linha}"
+    fim = f"{coluna_letra(col_fim or col_inicio)}{linha_fim or linha}"
+    return f"{ref_aba(aba)}!{inicio}:{fim}"
+
+
+def grade_texto(df):
+    """Valores como o set_with_dataframe os escreveria: vazio para nulos e repr para floats"""
+    grade = {}
+    for col in df.columns:
+        serie = df[col]
+        texto = serie.map(repr) if serie.dtype.kind == "f" else serie.astype(str)
+        grade[col] = texto.where(serie.notna(), "")
+    return pd.DataFrame(grade, index=df.index)
+
+
+def titulo_aba(spreadsheet_id, indice=0):
+    """Título da aba pela posição na planilha"""
+    return google_clients.propriedades_aba(spreadsheet_id, indice=indice)["title"]
+
+
+def ler_dataframe(spreadsheet_id, aba=None):
+    """Lê a aba inteira como o get_as_dataframe fazia (primeira linha como cabeçalho, tipos inferidos)"""
+    aba = aba or titulo_aba(spreadsheet_id)
+    valores = google_clients.ler_valores(spreadsheet_id, ref_aba(aba))
+    if not valores:
+        return pd.DataFrame()
+    return TextParser(valores, header=0).read().dropna(how="all")
+
+
+def _chaves(df, chaves):
+    """Chave textual de cada linha; repetições ganham um contador para ficarem únicas"""
+    chave = df[chaves[0]].astype(str)
+    for col in chaves[1:]:
+        chave = chave + "\x1f" + df[col].astype(str)
+    return (chave + "\x1f" + chave.groupby(chave).cumcount().astype(str)).to_numpy()
+
+
+def _sheet_confere(spreadsheet_id, aba, anterior):
+    """Confere se a aba ainda está como foi publicada: mesmo cabeçalho, última linha preenchida e nada abaixo dela
+
+    A última linha é lida em toda a largura: a API corta as células vazias do fim, então contar
+    só a coluna A erraria quando a última linha tem a primeira coluna vazia.
+    """
+    ultima = len(anterior) + 1
+    largura = coluna_letra(max(1, len(anterior.columns)))
+    resposta = google_clients.executar(google_clients.sheets_service().spreadsheets().values().batchGet(
+        spreadsheetId=spreadsheet_id, ranges=[f"{ref_aba(aba)}!1:1", f"{ref_aba(aba)}!A{ultima}:{largura}"]
+    ))
+    faixas = resposta.get("valueRanges", [])
+    cabecalho = (faixas[0].get("values") or [[]])[0]
+    fim = faixas[1].get("values", [])
+    return cabecalho == anterior.columns.tolist() and len(fim) == 1 and any(v != "" for v in fim[0])
+
+
+def _escrever(spreadsheet_id, dados, limpar, value_input_option):
+    """Envia os ranges alterados em lotes e só depois limpa as sobras"""
+    envio_planilhas.enviar(spreadsheet_id, dados, value_input_option)
+    envio_planilhas.limpar(spreadsheet_id, limpar)
+
+
+def _batch_update(spreadsheet_id, requests):
+    """batchUpdate estrutural da planilha"""
+    return google_clients.executar(google_clients.sheets_service().spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id, body={"requests": requests}
+    ))
+
+
+def publicar_completo(spreadsheet_id, aba, grade, value_input_option="RAW"):
+    """Reescreve a aba inteira sem deixá-la vazia em nenhum momento
+
+    Os dados vão para uma aba de preparo nova (grade do tamanho exato, formatação aplicada
+    só ao range escrito) e um único batchUpdate apaga a aba antiga e põe a de preparo no
+    lugar, com o mesmo nome e posição. Quem lê a planilha vê a versão antiga ou a nova.
+    """
+    n_linhas, n_colunas = grade.shape
+    n_colunas = max(n_colunas, 1)
+    existentes = google_clients.abas(spreadsheet_id)
+    antiga = next((p for p in existentes if p["title"] == aba), None)
+    sobras = [p for p in existentes if p["title"].startswith(aba + SUFIXO_PREPARO)]
+    ids_usados = {p["sheetId"] for p in existentes}
+
+    preparo_id = random.randint(1, 2 ** 31 - 1)
+    while preparo_id in ids_usados:
+        preparo_id = random.randint(1, 2 ** 31 - 1)
+    preparo = f"{aba}{SUFIXO_PREPARO}_{preparo_id}"
+
+    _batch_update(spreadsheet_id, [
+        {"addSheet": {"properties": {
+            "sheetId": preparo_id,
+            "title": preparo,
+            "gridProperties": {"rowCount": n_linhas + 1, "columnCount": n_colunas},
+        }}},
+        {"repeatCell": {
+            "range": {"sheetId": preparo_id, "startRowIndex": 0, "endRowIndex": n_linhas + 1,
+                      "startColumnIndex": 0, "endColumnIndex": n_colunas},
+            "cell": {"userEnteredFormat": FORMATO_CELULAS},
+            "fields": "userEnteredFormat(" + ",".join(FORMATO_CELULAS) + ")",
+        }},
+    ])
+    google_clients.invalidar_abas(spreadsheet_id)
+
+    try:
+        envio_planilhas.enviar(spreadsheet_id, [{
+            "range": intervalo(preparo, 1, 1, n_colunas, n_linhas + 1),
+            "values": [grade.columns.tolist()] + grade.values.tolist(),
+        }], value_input_option)
+    except Exception:
+        # Falhou no meio: descarta a aba de preparo e mantém a antiga intacta
+        _batch_update(spreadsheet_id, [{"deleteSheet": {"sheetId": preparo_id}}])
+        google_clients.invalidar_abas(spreadsheet_id)
+        raise
+
+    troca = [{"deleteSheet": {"sheetId": p["sheetId"]}} for p in sobras + ([antiga] if antiga else [])]
+    propriedades = {"sheetId": preparo_id, "title": aba}
+    if antiga:
+        propriedades["index"] = antiga.get("index", 0)
+    troca.append({"updateSheetProperties": {"properties": propriedades, "fields": ",".join(k for k in propriedades if k != "sheetId")}})
+    _batch_update(spreadsheet_id, troca)
+    google_clients.invalidar_abas(spreadsheet_id)
+    print(f"  📤 '{aba}': {n_linhas} linhas reescritas por completo (troca atômica)")
+
+
+def publicar(spreadsheet_id, grade, nome, aba=None, chaves=("id",), value_input_option="RAW"):
+    """Publica a grade (DataFrame de textos) enviando só as células que mudaram
+
+    Compara com a última versão publicada, guardada em estado/publicado/<nome>.arrow,
+    casando as linhas pela chave. Linhas removidas liberam posição para as novas; as
+    sobras são compactadas com as últimas linhas e o final da aba é limpo. Sem versão
+    anterior, com cabeçalho diferente ou se a aba foi mexida por fora, reescreve tudo.
+    """
+    aba = aba or titulo_aba(spreadsheet_id)
+    chaves = list(chaves)
+    grade = grade.reset_index(drop=True)
+    anterior = snapshots.carregar(nome, validade_horas=float("inf"), diretorio=PUBLICADO_DIR)
+
+    pode_diff = (
+        anterior is not None
+        and anterior.columns.tolist() == grade.columns.tolist()
+        and all(c in grade.columns for c in chaves)
+        and _sheet_confere(spreadsheet_id, aba, anterior)
+    )
+    if not pode_diff:
+        publicar_completo(spreadsheet_id, aba, grade, value_input_option)
+        snapshots.salvar(grade, nome, diretorio=PUBLICADO_DIR)
+        return
+
+    chaves_ant = _chaves(anterior, chaves)
+    chaves_novas = _chaves(grade, chaves)
+    posicao_ant = pd.Index(chaves_ant)
+    idx = posicao_ant.get_indexer(chaves_novas)
+
+    valores_ant = anterior.to_numpy(dtype=object)
+    valores_novos = grade.to_numpy(dtype=object)
+    n_colunas = grade.shape[1]
+
+    # dono[p] = linha da grade nova que ocupa a posição p da aba (-1 = posição livre)
+    dono = np.full(len(anterior), -1)
+    existentes = np.flatnonzero(idx >= 0)
+    dono[idx[existentes]] = existentes
+    livres = np.flatnonzero(dono < 0).tolist()
+    linhas_inteiras = {}
+
+    # Linhas novas ocupam as posições livres e depois o fim da aba
+    novas = np.flatnonzero(idx < 0)
+    ocupadas = livres[:len(novas)]
+    livres = livres[len(novas):]
+    dono[ocupadas] = novas[:len(ocupadas)]
+    dono = np.concatenate([dono, novas[len(ocupadas):]])
+    for pos in ocupadas + list(range(len(anterior), len(dono))):
+        linhas_inteiras[pos] = dono[pos]
+
+    # Sobraram posições livres: move as últimas linhas para elas e encolhe a aba
+    total = len(dono)
+    livres_set = set(livres)
+    while livres:
+        ultimo = total - 1
+        if ultimo in livres_set:
+            livres_set.discard(ultimo)
+            livres.remove(ultimo)
+        else:
+            pos = livres.pop(0)
+            livres_set.discard(pos)
+            dono[pos] = dono[ultimo]
+            linhas_inteiras[pos] = dono[ultimo]
+            linhas_inteiras.pop(ultimo, None)
+        total -= 1
+    dono = dono[:total]
+
+    # Células alteradas das linhas que continuam na mesma posição
+    dados = []
+    m = min(total, len(anterior))
+    mesma_pos = np.flatnonzero(idx[dono[:m]] == np.arange(m))
+    if len(mesma_pos):
+        diferentes = valores_novos[dono[mesma_pos]] != valores_ant[mesma_pos]
+        com_mudanca = diferentes.any(axis=1)
+        for pos, mascara in zip(mesma_pos[com_mudanca], diferentes[com_mudanca]):
+            if mascara.mean() > LIMITE_LINHA_INTEIRA:
+                linhas_inteiras[pos] = dono[pos]
+                continue
+            cols = np.flatnonzero(mascara)
+            # Agrupa colunas consecutivas num único range
+            quebras = np.flatnonzero(np.diff(cols) > 1) + 1
+            for bloco in np.split(cols, quebras):
+                dados.append({
+                    "range": intervalo(aba, pos + 2, bloco[0] + 1, bloco[-1] + 1),
+                    "values": [valores_novos[dono[pos], bloco[0]:bloco[-1] + 1].tolist()],
+                })
+
+    for pos, i in sorted(linhas_inteiras.items()):
+        dados.append({"range": intervalo(aba, pos + 2, 1, n_colunas), "values": [valores_novos[i].tolist()]})
+
+    limpar = [f"{ref_aba(aba)}!A{total + 2}:ZZ"] if total < len(anterior) else []
+    if total > len(anterior):
+        envio_planilhas.garantir_grade(spreadsheet_id, aba, total + 1, n_colunas, FORMATO_CELULAS)
+    # Sem a versão publicada durante o envio: se ele parar no meio, a próxima execução reescreve tudo
+    os.remove(snapshots.caminho(nome, PUBLICADO_DIR))
+    _escrever(spreadsheet_id, dados, limpar, value_input_option)
+
+    publicado = grade.iloc[dono].reset_index(drop=True)
+    snapshots.salvar(publicado, nome, diretorio=PUBLICADO_DIR)
+    print(f"  📤 '{aba}': {len(dados)} ranges enviados ({len(linhas_inteiras)} linhas inteiras), "
+          f"{len(grade) - len(existentes)} novas, {len(anterior) - len(existentes)} removidas")
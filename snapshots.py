@@ -0,0 +1,70 @@
+import os
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# ===================== Configurações =====================
+# Cópias locais (Arrow IPC) da saída de cada etapa; o Google Sheets vira só destino de publicação
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_VALIDADE_HORAS = float(os.getenv("SNAPSHOT_VALIDADE_HORAS", "12"))
+
+
+def caminho(nome, diretorio=None):
+    return os.path.join(diretorio or SNAPSHOT_DIR, f"{nome}.arrow")
+
+
+def _para_arrow(df):
+    """Converte para tabela Arrow; colunas object com tipos misturados viram texto"""
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if serie.dtype == object:
+            try:
+                pa.array(serie, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                serie = serie.where(serie.isna(), serie.astype(str))
+        colunas[col] = serie
+    tabela = pa.Table.from_pandas(pd.DataFrame(colunas), preserve_index=False)
+    return tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        b"gerado_em": str(time.time()).encode(),
+    })
+
+
+def salvar(df, nome, diretorio=None):
+    """Grava o snapshot de uma etapa de forma atômica (sem compressão, para permitir memory map)"""
+    os.makedirs(diretorio or SNAPSHOT_DIR, exist_ok=True)
+    destino = caminho(nome, diretorio)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    feather.write_feather(_para_arrow(df), temporario, compression="uncompressed")
+    os.replace(temporario, destino)
+    if diretorio is None:
+        print(f"💾 Snapshot '{nome}' salvo com {len(df)} registros")
+
+
+def idade_horas(nome, diretorio=None):
+    """Idade do snapshot em horas, ou None se ele não existir"""
+    try:
+        with pa.memory_map(caminho(nome, diretorio)) as arquivo:
+            metadata = pa.ipc.open_file(arquivo).schema.metadata or {}
+    except FileNotFoundError:
+        return None
+    gerado_em = float(metadata.get(b"gerado_em", os.path.getmtime(caminho(nome, diretorio))))
+    return (time.time() - gerado_em) / 3600
+
+
+def carregar_tabela(nome, colunas=None, validade_horas=SNAPSHOT_VALIDADE_HORAS, diretorio=None):
+    """Lê o snapshot como tabela Arrow via memory map; devolve None se não existir ou estiver vencido"""
+    idade = idade_horas(nome, diretorio)
+    if idade is None or idade > validade_horas:
+        return None
+    return feather.read_table(caminho(nome, diretorio), columns=colunas, memory_map=True)
+
+
+def carregar(nome, colunas=None, validade_horas=SNAPSHOT_VALIDADE_HORAS, diretorio=None):
+    """Lê o snapshot como DataFrame; devolve None se não existir ou estiver vencido"""
+    tabela = carregar_tabela(nome, colunas, validade_horas, diretorio)
+    if tabela is None:
+        return None
+    return tabela.to_pandas()
@@ -0,0 +1,204 @@
+import os
+import json
+import sqlite3
+from contextlib import closing
+from collections import namedtuple
+from datetime import datetime, timedelta
+import pandas as pd
+
+# ===================== Configurações =====================
+ESTADO_DIR = os.getenv("ESTADO_DIR", "estado")
+ARQUIVO_ESTADO = os.path.join(ESTADO_DIR, "contas.sqlite")
+
+# incremental: baixa só o que pode ter mudado | completo: força a reconciliação total
+SYNC_MODO = os.getenv("SYNC_MODO", "incremental")
+SYNC_COMPLETA_DIAS = int(os.getenv("SYNC_COMPLETA_DIAS", "7"))
+SYNC_JANELA_DIAS = int(os.getenv("SYNC_JANELA_DIAS", "45"))
+
+# Status ainda abertos são sempre baixados por inteiro; os liquidados só dentro da janela
+STATUS_ABERTOS = ["PARTIAL", "PENDING", "OVERDUE"]
+# Perdidos e renegociados não têm "Data movimento": o dateFrom os excluiria sempre
+STATUS_SEM_DATA = ["LOST", "RENEGOTIATED"]
+STATUS_SEM_JANELA = STATUS_ABERTOS + STATUS_SEM_DATA
+
+Delta = namedtuple("Delta", ["novos", "alterados", "removidos"])
+
+
+def conectar():
+    """Abre o banco SQLite do estado local, criando as tabelas se necessário"""
+    os.makedirs(ESTADO_DIR, exist_ok=True)
+    conn = sqlite3.connect(ARQUIVO_ESTADO, timeout=60)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS registros (
+            tipo TEXT NOT NULL,
+            id TEXT NOT NULL,
+            ordem INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            status_origem TEXT,
+            dados TEXT NOT NULL,
+            PRIMARY KEY (tipo, id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sincronizacoes (
+            tipo TEXT PRIMARY KEY,
+            colunas TEXT NOT NULL,
+            ultima_completa TEXT,
+            ultima TEXT
+        )
+    """)
+    return conn
+
+
+def carregar(tipo):
+    """Carrega o estado guardado de um tipo (registros, hashes e status de origem por id) ou None"""
+    with closing(conectar()) as conn, conn:
+        meta = conn.execute(
+            "SELECT colunas, ultima_completa, ultima FROM sincronizacoes WHERE tipo = ?", (tipo,)
+        ).fetchone()
+        if meta is None:
+            return None
+
+        linhas = conn.execute(
+            "SELECT id, hash, status_origem, dados FROM registros WHERE tipo = ? ORDER BY ordem", (tipo,)
+        ).fetchall()
+
+    colunas = json.loads(meta[0])
+    ids = [l[0] for l in linhas]
+    return {
+        "df": pd.DataFrame([json.loads(l[3]) for l in linhas], columns=colunas).infer_objects(),
+        "hash": pd.Series([l[1] for l in linhas], index=ids, dtype=object),
+        "origem": pd.Series([l[2] for l in linhas], index=ids, dtype=object),
+        "colunas": colunas,
+        "ultima_completa": meta[1],
+        "ultima": meta[2],
+    }
+
+
+def precisa_sync_completa(estado):
+    """Decide se esta execução deve reconciliar todo o histórico"""
+    if SYNC_MODO == "completo" or estado is None or not estado["ultima_completa"]:
+        return True
+    ultima_completa = datetime.fromisoformat(estado["ultima_completa"])
+    return datetime.now() - ultima_completa >= timedelta(days=SYNC_COMPLETA_DIAS)
+
+
+def janelas_incrementais(status_list, estado):
+    """Monta o dateFrom dos status liquidados a partir da última sincronização"""
+    ultima = datetime.fromisoformat(estado["ultima"])
+    date_from = (ultima - timedelta(days=SYNC_JANELA_DIAS)).strftime("%Y-%m-%d")
+    return {s: date_from for s in status_list if s not in STATUS_SEM_JANELA}
+
+
+def status_de_origem(all_dataframes):
+    """Status consultado de cada id, respeitando o drop_duplicates(keep='first') da consolidação"""
+    origem = pd.concat([df[['id', 'status']] for df in all_dataframes], ignore_index=True)
+    origem = origem.drop_duplicates(subset=['id'], keep='first')
+    return pd.Series(origem['status'].values, index=origem['id'].astype(str), dtype=object)
+
+
+def calcular_hashes(df):
+    """Hash de conteúdo de cada linha (vetorizado)"""
+    hashes = pd.util.hash_pandas_object(df, index=False).map("{:016x}".format)
+    return pd.Series(hashes.values, index=df['id'].values, dtype=object)
+
+
+def comparar(estado, atual, origem):
+    """Delta de uma sincronização completa contra o estado guardado"""
+    hash_atual = calcular_hashes(atual)
+    if estado is None:
+        return Delta(atual['id'].tolist(), [], []), hash_atual, origem
+    if estado["colunas"] != atual.columns.tolist():
+        return Delta(atual['id'].tolist(), [], estado["hash"].index.tolist()), hash_atual, origem
+
+    hash_anterior = estado["hash"]
+    comuns = hash_atual.index.intersection(hash_anterior.index)
+    alterados = comuns[(hash_atual.loc[comuns] != hash_anterior.loc[comuns]).to_numpy()]
+    delta = Delta(
+        hash_atual.index.difference(hash_anterior.index).tolist(),
+        alterados.tolist(),
+        hash_anterior.index.difference(hash_atual.index).tolist(),
+    )
+    return delta, hash_atual, origem
+
+
+def mesclar(estado, parcial, origem):
+    """Aplica um download parcial sobre o estado guardado e calcula o delta
+
+    Nenhum registro é dado como removido: um id que sumiu de um status pode ter ido para um
+    status liquidado fora da janela de datas. Os sumiços só são confirmados na próxima
+    reconciliação completa (comparar), quando todos os status são baixados por inteiro.
+    """
+    anterior = estado["df"].set_index('id', drop=False)
+    parcial = parcial.set_index('id', drop=False)[anterior.columns]
+
+    combinado = anterior
+    comuns = parcial.index.intersection(combinado.index)
+    combinado.loc[comuns] = parcial.loc[comuns]
+    novos = parcial.index.difference(combinado.index, sort=False)
+    combinado = pd.concat([combinado, parcial.loc[novos]]).reset_index(drop=True)
+
+    hash_anterior = estado["hash"]
+    hash_atual = calcular_hashes(combinado)
+    alterados = comuns[(hash_atual.loc[comuns] != hash_anterior.loc[comuns]).to_numpy()]
+
+    origem_final = estado["origem"]
+    origem_final = pd.concat([origem_final[~origem_final.index.isin(origem.index)], origem])
+
+    delta = Delta(novos.tolist(), alterados.tolist(), [])
+    return combinado, delta, hash_atual, origem_final
+
+
+def salvar(tipo, df, delta, hashes, origem, completa):
+    """Grava no estado local só os registros novos/alterados e apaga os removidos
+
+    Na sincronização completa o estado do tipo é regravado por inteiro.
+    """
+    agora = datetime.now().isoformat(timespec="seconds")
+    colunas = json.dumps(df.columns.tolist(), ensure_ascii=False)
+
+    with closing(conectar()) as conn, conn:
+        if completa:
+            conn.execute("DELETE FROM registros WHERE tipo = ?", (tipo,))
+            gravar = df
+            base_ordem = 0
+        else:
+            conn.executemany(
+                "DELETE FROM registros WHERE tipo = ? AND id = ?", [(tipo, i) for i in delta.removidos]
+            )
+            gravar = df[df['id'].isin(set(delta.novos) | set(delta.alterados))]
+            base_ordem = conn.execute(
+                "SELECT COALESCE(MAX(ordem), -1) + 1 FROM registros WHERE tipo = ?", (tipo,)
+            ).fetchone()[0]
+
+        # Registros novos vão para o fim; os alterados mantêm a posição (ordem) original
+        novos = set(delta.novos)
+        hashes = hashes.to_dict()
+        origem = origem.to_dict()
+        linhas = []
+        for id_, valores in zip(gravar['id'].tolist(), gravar.values.tolist()):
+            ordem = base_ordem
+            if completa or id_ in novos:
+                base_ordem += 1
+            linhas.append((tipo, id_, ordem, hashes[id_], origem.get(id_), json.dumps(valores, ensure_ascii=False)))
+
+        conn.executemany(
+            """
+            INSERT INTO registros (tipo, id, ordem, hash, status_origem, dados) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(tipo, id) DO UPDATE SET
+                hash = excluded.hash,
+                status_origem = excluded.status_origem,
+                dados = excluded.dados
+            """,
+            linhas,
+        )
+        conn.execute(
+            """
+            INSERT INTO sincronizacoes (tipo, colunas, ultima_completa, ultima) VALUES (?, ?, ?, ?)
+            ON CONFLICT(tipo) DO UPDATE SET
+                colunas = excluded.colunas,
+                ultima_completa = COALESCE(excluded.ultima_completa, sincronizacoes.ultima_completa),
+                ultima = excluded.ultima
+            """,
+            (tipo, colunas, agora if completa else None, agora),
+        )
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# ===================== Layout da tabela de detalhes =====================
+# Colunas fixas; as de categoria (categoriesRatio.*) aparecem na ordem em que surgem nos payloads
+COLUNA_ID = "id"
+COLUNAS_FINAIS = ["tem_attachments", "observation"]
+PREFIXO_CATEGORIA = "categoriesRatio."
+PREFIXO_CENTRO = "categoriesRatio.costCentersRatio."
+
+
+def _tem_attachments(item, observation):
+    """'Sim' se há anexos na API ou se a observação manda desconsiderar anexo"""
+    if "desconsiderar anexo" in observation.lower():
+        return "Sim"
+    return "Sim" if item.get("attachments") else "Não"
+
+
+def montar(payloads):
+    """Achata os resumos (uma linha por categoria) direto em arrays por coluna
+
+    Conta as linhas antes, aloca cada coluna uma única vez quando ela aparece e
+    preenche por posição; o DataFrame sai de uma vez, com id, colunas de categoria
+    e por fim tem_attachments e observation.
+    """
+    payloads = list(payloads)
+    n = sum(max(1, len(item.get("categoriesRatio") or [])) for item in payloads)
+
+    ids = np.empty(n, dtype=object)
+    anexos = np.empty(n, dtype=object)
+    observacoes = np.empty(n, dtype=object)
+    categorias = {}
+
+    def coluna(nome):
+        valores = categorias.get(nome)
+        if valores is None:
+            valores = categorias[nome] = np.full(n, None, dtype=object)
+        return valores
+
+    linha = 0
+    for item in payloads:
+        observation = item.get("observation", "") or ""
+        tem_attachments = _tem_attachments(item, observation)
+        cats = item.get("categoriesRatio") or []
+        inicio = linha
+
+        for cat in cats:
+            for k, v in cat.items():
+                if k == "costCentersRatio":
+                    for i, centro in enumerate(v or []):
+                        for ck, cv in centro.items():
+                            coluna(f"{PREFIXO_CENTRO}{i}.{ck}")[linha] = cv
+                else:
+                    coluna(f"{PREFIXO_CATEGORIA}{k}")[linha] = v
+            linha += 1
+
+        # Sem categoriesRatio ainda gera uma linha com id, anexos e observação
+        if not cats:
+            linha += 1
+        ids[inicio:linha] = item.get("id")
+        anexos[inicio:linha] = tem_attachments
+        observacoes[inicio:linha] = observation
+
+    dados = {COLUNA_ID: ids, **categorias, COLUNAS_FINAIS[0]: anexos, COLUNAS_FINAIS[1]: observacoes}
+    return pd.DataFrame(dados).infer_objects()
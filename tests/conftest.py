@@ -0,0 +1,30 @@
+import os
+import sys
+import uuid
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmark"))
+
+from stub_google import iniciar_google  # noqa: E402
+
+# Sheets/Drive local para todos os testes; precisa estar no ambiente antes de importar google_clients
+_GOOGLE = iniciar_google()
+os.environ["GOOGLE_API_EMULADOR"] = _GOOGLE.url
+os.environ.setdefault("INSTRUMENTACAO", "0")
+for _cota in ("SHEETS_LEITURAS_POR_MINUTO", "SHEETS_ESCRITAS_POR_MINUTO",
+              "SHEETS_LEITURAS_PROJETO_POR_MINUTO", "SHEETS_ESCRITAS_PROJETO_POR_MINUTO"):
+    os.environ.setdefault(_cota, "1000000")
+
+
+@pytest.fixture
+def google():
+    """Servidor local do Sheets/Drive (benchmark/stub_google.py)"""
+    return _GOOGLE
+
+
+@pytest.fixture
+def planilha(google):
+    """ID de uma planilha nova e vazia no servidor local (só com a aba padrão)"""
+    return f"teste-{uuid.uuid4().hex}"
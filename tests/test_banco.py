@@ -0,0 +1,96 @@
+import sqlite3
+from contextlib import closing
+import pandas as pd
+import pytest
+import banco
+
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'banco.sqlite'}"
+
+
+def _contas(linhas):
+    df = pd.DataFrame(linhas, columns=["id", "status", "paid", "dueDate", "Descrição"])
+    df["dueDate"] = pd.to_datetime(df["dueDate"])
+    return df
+
+
+def _tabela(url, tabela="contas"):
+    with closing(sqlite3.connect(url.split(":///", 1)[1])) as conn:
+        return conn.execute(f'SELECT id, status, paid, "dueDate", "Descrição" FROM {tabela} ORDER BY id').fetchall()
+
+
+BASE = [
+    ["a", "PENDING", 10.5, "2024-01-05", "aluguel"],
+    ["b", "ACQUITTED", 20.0, "2024-02-10", None],
+    ["c", "OVERDUE", 30.25, None, "luz"],
+]
+
+
+def test_primeira_carga(url):
+    resultado = banco.salvar(_contas(BASE), "contas", url=url)
+
+    assert resultado == {"linhas": 3, "gravadas": 3, "removidas": 0}
+    assert _tabela(url) == [
+        ("a", "PENDING", 10.5, "2024-01-05", "aluguel"),
+        ("b", "ACQUITTED", 20.0, "2024-02-10", None),
+        ("c", "OVERDUE", 30.25, None, "luz"),
+    ]
+
+
+def test_recarga_identica_nao_muda_nada(url):
+    banco.salvar(_contas(BASE), "contas", url=url)
+    antes = _tabela(url)
+
+    resultado = banco.salvar(_contas(BASE), "contas", url=url)
+
+    assert resultado == {"linhas": 3, "gravadas": 0, "removidas": 0}
+    assert _tabela(url) == antes
+
+
+def test_upsert_e_remocao_das_ausentes(url):
+    banco.salvar(_contas(BASE), "contas", url=url)
+    nova = [
+        ["a", "ACQUITTED", 10.5, "2024-01-05", "aluguel"],   # alterada
+        ["c", "OVERDUE", 30.25, None, "luz"],                # igual
+        ["d", "PENDING", 5.0, "2024-03-01", "água"],          # nova ("b" sumiu)
+    ]
+
+    resultado = banco.salvar(_contas(nova), "contas", url=url)
+
+    assert resultado == {"linhas": 3, "gravadas": 2, "removidas": 1}
+    assert [linha[:2] for linha in _tabela(url)] == [("a", "ACQUITTED"), ("c", "OVERDUE"), ("d", "PENDING")]
+
+
+def test_coluna_nova_e_chave_composta(url):
+    df = pd.DataFrame({"tipo": ["Receita", "Despesa"], "id": ["x", "x"], "paid_new": [1.0, 2.0]})
+    banco.salvar(df, "pivot", chaves=("tipo", "id"), url=url)
+    df["Centro_de_Custo_Unificado"] = ["A", "B"]
+
+    resultado = banco.salvar(df, "pivot", chaves=("tipo", "id"), url=url)
+
+    assert resultado["gravadas"] == 2
+    with closing(sqlite3.connect(url.split(":///", 1)[1])) as conn:
+        linhas = conn.execute('SELECT tipo, id, "Centro_de_Custo_Unificado" FROM pivot ORDER BY tipo').fetchall()
+    assert linhas == [("Despesa", "x", "B"), ("Receita", "x", "A")]
+
+
+def test_sem_db_url_nao_faz_nada(monkeypatch):
+    monkeypatch.setattr(banco, "DB_URL", "")
+    assert banco.salvar(_contas(BASE), "contas") is None
+
+
+def test_publicar_nao_propaga_falha_do_banco(url, monkeypatch, capsys):
+    def falhar(url=None):
+        raise sqlite3.OperationalError("banco fora do ar")
+
+    monkeypatch.setattr(banco, "conectar", falhar)
+    assert banco.publicar(_contas(BASE), "contas", url=url) is None
+    assert "banco fora do ar" in capsys.readouterr().out
+
+
+def test_tipos_postgres():
+    assert banco.tipo_sql("paid", "postgres") == "NUMERIC(14,2)"
+    assert banco.tipo_sql("dueDate", "postgres") == "DATE"
+    assert banco.tipo_sql("Descrição", "postgres") == "TEXT"
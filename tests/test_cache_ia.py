@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from contextlib import closing
+import pytest
+import cache_ia
+
+MENSAGENS = [{"role": "user", "content": "Resumo do mês"}]
+
+
+class ClienteFalso:
+    """Imita client.chat.completions.create e conta as chamadas"""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.base_url = "http://ia.local/"
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **parametros):
+        self.chamadas += 1
+        conteudo = f"resposta {self.chamadas}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=conteudo))])
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    return str(tmp_path / "cache_ia.sqlite")
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio controlado pelo teste (time.time dentro de cache_ia)"""
+    agora = {"t": 1_700_000_000.0}
+    monkeypatch.setattr(cache_ia.time, "time", lambda: agora["t"])
+    return agora
+
+
+def test_chave_sha256_estavel_e_sensivel_ao_pedido():
+    base = cache_ia.chave("modelo", MENSAGENS, temperature=0.2)
+    assert len(base) == 64 and int(base, 16) >= 0
+    assert cache_ia.chave("modelo", [dict(m) for m in MENSAGENS], temperature=0.2) == base
+    assert cache_ia.chave("outro", MENSAGENS, temperature=0.2) != base
+    assert cache_ia.chave("modelo", MENSAGENS, temperature=0.3) != base
+    assert cache_ia.chave("modelo", [{"role": "user", "content": "Outro mês"}], temperature=0.2) != base
+
+
+def test_acerto_e_falta(arquivo):
+    cliente = ClienteFalso()
+    primeira = cache_ia.completar(cliente, "modelo", MENSAGENS, arquivo=arquivo, temperature=0.2)
+    repetida = cache_ia.completar(cliente, "modelo", MENSAGENS, arquivo=arquivo, temperature=0.2)
+    assert primeira == repetida == "resposta 1"
+    assert cliente.chamadas == 1
+
+    # Pedido diferente: falta no cache e nova chamada
+    outra = cache_ia.completar(cliente, "modelo", MENSAGENS, arquivo=arquivo, temperature=0.9)
+    assert outra == "resposta 2"
+    assert cliente.chamadas == 2
+
+
+def test_ttl_vencido(arquivo, relogio):
+    cache_ia.guardar("k", "modelo", "antiga", ttl_dias=1, arquivo=arquivo)
+    relogio["t"] += 0.5 * 86400
+    assert cache_ia.buscar("k", ttl_dias=1, arquivo=arquivo) == "antiga"
+    relogio["t"] += 0.6 * 86400
+    assert cache_ia.buscar("k", ttl_dias=1, arquivo=arquivo) is None
+
+    # A próxima gravação apaga as vencidas
+    cache_ia.guardar("nova", "modelo", "x", ttl_dias=1, arquivo=arquivo)
+    with closing(cache_ia.conectar(arquivo)) as conn:
+        assert [l[0] for l in conn.execute("SELECT chave FROM respostas")] == ["nova"]
+
+
+def test_lru_descarta_a_menos_usada(arquivo, relogio):
+    for k in ("a", "b"):
+        cache_ia.guardar(k, "modelo", k, max_entradas=2, arquivo=arquivo)
+        relogio["t"] += 1
+    # "a" foi usada por último; "b" vira a menos recente
+    assert cache_ia.buscar("a", arquivo=arquivo) == "a"
+    relogio["t"] += 1
+
+    cache_ia.guardar("c", "modelo", "c", max_entradas=2, arquivo=arquivo)
+
+    assert cache_ia.buscar("b", arquivo=arquivo) is None
+    assert cache_ia.buscar("a", arquivo=arquivo) == "a"
+    assert cache_ia.buscar("c", arquivo=arquivo) == "c"
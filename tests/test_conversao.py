@@ -0,0 +1,54 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conversao  # noqa: E402
+
+
+def test_datas_vazias_ou_nulas():
+    for serie in (pd.Series([], dtype=object), pd.Series([None, None], dtype=object)):
+        resultado = conversao.datas(serie)
+        assert len(resultado) == len(serie)
+        assert resultado.isna().all()
+
+
+def test_dinheiro_vazio_ou_nulo():
+    for serie in (pd.Series([], dtype=object), pd.Series([None, np.nan], dtype=object)):
+        resultado = conversao.dinheiro(serie)
+        assert len(resultado) == len(serie)
+        assert resultado.isna().all()
+
+
+def test_datas_com_nulos():
+    resultado = conversao.datas(pd.Series(["31/01/2024", None, "2024-02-01"], dtype=object))
+    assert list(resultado.dt.strftime("%Y-%m-%d").fillna("")) == ["2024-01-31", "", "2024-02-01"]
+
+
+def test_dinheiro_ponto_decimal_nao_vira_milhar():
+    resultado = conversao.dinheiro(pd.Series(["12.345", "0.5", "1234.56"], dtype=object))
+    assert list(resultado) == [12.345, 0.5, 1234.56]
+
+
+def test_dinheiro_milhar():
+    assert list(conversao.dinheiro(pd.Series(["1.234.567", "-2.000.000"], dtype=object))) == [1234567.0, -2000000.0]
+    # Com vírgula decimal na coluna, um grupo de pontos é milhar
+    assert list(conversao.dinheiro(pd.Series(["R$ 1.234,56", "12.345"], dtype=object))) == [1234.56, 12345.0]
+
+
+def test_consolidar_sem_quitados():
+    """Lote sem nenhum Quitado/Conciliado: 'Data do último pagamento' fica toda vazia"""
+    import extrator_contas
+
+    export = pd.DataFrame({
+        "id": ["a", "b"],
+        "status": ["PENDING", "PENDING"],
+        "Situação": ["Em aberto", "Em aberto"],
+        "Data movimento": [None, None],
+        "Valor (R$)": [10.0, 20.0],
+    })
+    df = extrator_contas.consolidar([export], "teste")
+    assert len(df) == 2
+    assert df["lastAcquittanceDate"].isna().all()
@@ -0,0 +1,118 @@
+import random
+import asyncio
+import threading
+import pytest
+from aiohttp import web
+import detalhes_eventos
+
+
+class Servidor:
+    """API de detalhes local (aiohttp) numa thread própria, com a resposta definida pelo teste"""
+
+    def __init__(self, tratar):
+        self.tratar = tratar
+        self.em_andamento = 0
+        self.maximo_simultaneo = 0
+        self.loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_get("/eventos/{fid}", self._rota)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        porta = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{porta}/eventos/{{fid}}"
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    async def _rota(self, request):
+        self.em_andamento += 1
+        self.maximo_simultaneo = max(self.maximo_simultaneo, self.em_andamento)
+        try:
+            return await self.tratar(self, request.match_info["fid"])
+        finally:
+            self.em_andamento -= 1
+
+    def fechar(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def servidor():
+    criados = []
+
+    def criar(tratar):
+        criados.append(Servidor(tratar))
+        return criados[-1]
+
+    yield criar
+    for s in criados:
+        s.fechar()
+
+
+def _buscar(url, ids, inicial=10):
+    concorrencia = {"inicial": inicial, "minimo": 2, "maximo": 64}
+    return asyncio.run(detalhes_eventos._buscar_todos(ids, url, 8, 10, concorrencia))
+
+
+def test_latencia_oscilando_nao_reduz_a_concorrencia(servidor):
+    async def tratar(srv, fid):
+        await asyncio.sleep(random.uniform(0.02, 0.12))
+        return web.json_response({"id": fid})
+
+    srv = servidor(tratar)
+    ids = [str(i) for i in range(300)]
+    detalhes, falhas, controle = _buscar(srv.url, ids)
+    assert falhas == {} and len(detalhes) == len(ids)
+    assert controle.limite >= 10
+    assert controle.pico > 10
+
+
+def test_429_reduz_a_concorrencia(servidor):
+    async def tratar(srv, fid):
+        await asyncio.sleep(0.01)
+        # Cota do servidor: mais de 4 requisições simultâneas recebem 429
+        if srv.em_andamento > 4:
+            return web.json_response({"erro": "cota"}, status=429, headers={"Retry-After": "0"})
+        return web.json_response({"id": fid})
+
+    srv = servidor(tratar)
+    ids = [str(i) for i in range(200)]
+    detalhes, falhas, controle = _buscar(srv.url, ids)
+    assert falhas == {} and len(detalhes) == len(ids)
+    assert controle.limite < 10
+
+
+def test_erro_definitivo_nao_e_repetido(servidor):
+    chamadas = []
+
+    async def tratar(srv, fid):
+        chamadas.append(fid)
+        if fid == "apagado":
+            return web.json_response({"erro": "não encontrado"}, status=404)
+        return web.json_response({"id": fid})
+
+    srv = servidor(tratar)
+    detalhes, falhas, controle = _buscar(srv.url, ["a", "apagado", "b"])
+    assert set(detalhes) == {"a", "b"}
+    assert falhas == {"apagado": "HTTP 404"}
+    assert chamadas.count("apagado") == 1
+    assert controle.limite >= 10
+
+
+@pytest.mark.parametrize("motivo, permanente", [
+    ("HTTP 404", True),
+    ("HTTP 403", True),
+    ("HTTP 410", True),
+    ("HTTP 401", False),
+    ("HTTP 429", False),
+    ("HTTP 503", False),
+    ("TimeoutError: ", False),
+    ("ClientConnectorError: recusada", False),
+    (None, False),
+])
+def test_falha_permanente(motivo, permanente):
+    assert detalhes_eventos.falha_permanente(motivo) is permanente
@@ -0,0 +1,28 @@
+import envio_planilhas
+import google_clients
+import publicacao
+
+
+def _aba(google, planilha, titulo):
+    return google.estado.planilha(planilha).aba(titulo)
+
+
+def test_garantir_grade_formata_celulas_novas(google, planilha):
+    google_clients.garantir_aba(planilha, "Dados", linhas=3, colunas=2)
+
+    envio_planilhas.garantir_grade(planilha, "Dados", 5, 3, publicacao.FORMATO_CELULAS)
+
+    aba = _aba(google, planilha, "Dados")
+    assert aba.props["gridProperties"] == {"rowCount": 5, "columnCount": 3}
+    # Linhas novas em toda a largura e a coluna nova das linhas antigas
+    assert sorted(aba.formatadas) == [(0, 3, 2, 3), (3, 5, 0, 3)]
+
+
+def test_garantir_grade_sem_crescer_nao_envia_nada(google, planilha):
+    google_clients.garantir_aba(planilha, "Dados", linhas=10, colunas=4)
+
+    envio_planilhas.garantir_grade(planilha, "Dados", 5, 3, publicacao.FORMATO_CELULAS)
+
+    aba = _aba(google, planilha, "Dados")
+    assert aba.props["gridProperties"] == {"rowCount": 10, "columnCount": 4}
+    assert aba.formatadas == []
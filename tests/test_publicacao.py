@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+import google_clients
+import publicacao
+import snapshots
+
+ABA = "Dados"
+
+
+@pytest.fixture(autouse=True)
+def publicado_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(publicacao, "PUBLICADO_DIR", str(tmp_path / "publicado"))
+
+
+def _grade(linhas):
+    return pd.DataFrame(linhas, columns=["id", "nome", "valor"])
+
+
+def _ler(planilha):
+    """Linhas da aba como a API devolve, completadas até a largura do cabeçalho"""
+    valores = google_clients.ler_valores(planilha, publicacao.ref_aba(ABA))
+    largura = len(valores[0]) if valores else 0
+    return [linha + [""] * (largura - len(linha)) for linha in valores]
+
+
+def _sheet_id(planilha):
+    google_clients.invalidar_abas(planilha)
+    return google_clients.propriedades_aba(planilha, ABA)["sheetId"]
+
+
+def _publicar(planilha, grade):
+    publicacao.publicar(planilha, grade, "teste", aba=ABA, chaves=("id",))
+
+
+def _confere(planilha, grade):
+    """A aba tem exatamente as linhas da grade e o estado publicado segue a ordem da aba"""
+    valores = _ler(planilha)
+    assert valores[0] == grade.columns.tolist()
+    assert sorted(map(tuple, valores[1:])) == sorted(map(tuple, grade.values.tolist()))
+    publicado = snapshots.carregar("teste", validade_horas=float("inf"), diretorio=publicacao.PUBLICADO_DIR)
+    assert publicado.values.tolist() == valores[1:]
+
+
+@pytest.fixture
+def publicada(planilha):
+    """Planilha com uma primeira publicação de 5 linhas"""
+    google_clients.garantir_aba(planilha, ABA)
+    grade = _grade([[str(i), f"nome {i}", str(i * 10)] for i in range(5)])
+    _publicar(planilha, grade)
+    return planilha, grade
+
+
+def test_primeira_publicacao(publicada):
+    planilha, grade = publicada
+    _confere(planilha, grade)
+    assert _ler(planilha)[1] == ["0", "nome 0", "0"]
+
+
+def test_diff_com_alteradas_novas_e_removidas(google, publicada):
+    planilha, grade = publicada
+    sheet_id = _sheet_id(planilha)
+
+    nova = grade[grade["id"] != "1"].copy()
+    nova.loc[nova["id"] == "3", "valor"] = "999"
+    nova = pd.concat([nova, _grade([["5", "nome 5", "50"], ["6", "", "60"]])], ignore_index=True)
+    _publicar(planilha, nova)
+
+    # Diff, não reescrita: a aba continua a mesma (a reescrita troca por uma aba nova)
+    assert _sheet_id(planilha) == sheet_id
+    _confere(planilha, nova)
+
+
+def test_diff_encolhe_a_aba(publicada):
+    planilha, grade = publicada
+    sheet_id = _sheet_id(planilha)
+
+    menor = grade[grade["id"].isin(["0", "4"])].reset_index(drop=True)
+    _publicar(planilha, menor)
+
+    assert _sheet_id(planilha) == sheet_id
+    assert len(_ler(planilha)) == 3
+    _confere(planilha, menor)
+
+
+def test_ultima_linha_com_primeira_coluna_vazia_continua_no_diff(planilha):
+    google_clients.garantir_aba(planilha, ABA)
+    grade = pd.DataFrame({"tipo": ["R", ""], "id": ["a", "b"], "valor": ["1", "2"]})
+    publicacao.publicar(planilha, grade, "teste", aba=ABA, chaves=("id",))
+    sheet_id = _sheet_id(planilha)
+
+    grade.loc[0, "valor"] = "9"
+    publicacao.publicar(planilha, grade, "teste", aba=ABA, chaves=("id",))
+
+    assert _sheet_id(planilha) == sheet_id
+    _confere(planilha, grade)
+
+
+@pytest.mark.parametrize("edicao", ["linha_a_mais", "cabecalho", "linha_apagada"])
+def test_aba_mexida_a_mao_reescreve_tudo(google, publicada, edicao):
+    planilha, grade = publicada
+    aba = google.estado.planilha(planilha).aba(ABA)
+    if edicao == "linha_a_mais":
+        aba.props["gridProperties"]["rowCount"] += 1
+        aba.linhas.append(["x", "manual", "1"])
+    elif edicao == "cabecalho":
+        aba.linhas[0][1] = "Nome"
+    else:
+        del aba.linhas[-1]
+    sheet_id = _sheet_id(planilha)
+
+    nova = grade.copy()
+    nova.loc[0, "valor"] = "123"
+    _publicar(planilha, nova)
+
+    assert _sheet_id(planilha) != sheet_id
+    _confere(planilha, nova)
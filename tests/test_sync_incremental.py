@@ -0,0 +1,37 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sync_incremental  # noqa: E402
+
+
+def _estado(df, origem):
+    return {
+        "df": df,
+        "hash": sync_incremental.calcular_hashes(df),
+        "origem": pd.Series(origem, index=df["id"].tolist(), dtype=object),
+        "colunas": df.columns.tolist(),
+    }
+
+
+def test_mesclar_nao_remove_ids_ausentes():
+    """Um PENDING que virou LOST/ACQUITTED fora da janela não some do estado"""
+    anterior = pd.DataFrame({"id": ["a", "b"], "status": ["PENDING", "PENDING"], "paid": [1.0, 2.0]})
+    estado = _estado(anterior, ["PENDING", "PENDING"])
+    parcial = pd.DataFrame({"id": ["b", "c"], "status": ["PENDING", "PENDING"], "paid": [5.0, 3.0]})
+    origem = pd.Series(["PENDING", "PENDING"], index=["b", "c"], dtype=object)
+
+    df, delta, hashes, origem_final = sync_incremental.mesclar(estado, parcial, origem)
+
+    assert df["id"].tolist() == ["a", "b", "c"]
+    assert delta.removidos == []
+    assert delta.novos == ["c"] and delta.alterados == ["b"]
+    assert origem_final.loc["a"] == "PENDING"
+
+
+def test_janelas_baixam_perdidos_e_renegociados_inteiros():
+    estado = {"ultima": "2024-06-01T10:00:00"}
+    janelas = sync_incremental.janelas_incrementais(["ACQUITTED", "PENDING", "LOST", "RENEGOTIATED"], estado)
+    assert list(janelas) == ["ACQUITTED"]